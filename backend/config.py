@@ -2,10 +2,12 @@
 Configuration settings for the Movie Recommender Backend
 """
 import os
-from dotenv import load_dotenv
 
-# Load environment variables
-load_dotenv()
+# Load environment variables from .env, unless the environment has already
+# been populated (e.g. by the container) and CONFIG_CACHED=1 says so
+if os.getenv("CONFIG_CACHED") != "1":
+    from dotenv import load_dotenv
+    load_dotenv()
 
 # Redis Cloud Configuration
 REDIS_URL = os.environ["REDIS_URL"]
@@ -16,16 +18,44 @@ OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
 # Index Configuration
 INDEX_NAME = "movies"
 EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+# Device for the embedding model ("cuda", "cpu", ...); unset = CUDA when available
+EMBEDDING_DEVICE = os.getenv("EMBEDDING_DEVICE") or None
+EMBEDDING_BATCH_SIZE = 128  # Texts per forward pass when embedding in bulk
+# Run the embedding model's Linear layers as int8 on CPU (CUDA always runs it in fp16).
+# Vectors shift slightly, so rebuild the indexes after changing this.
+EMBEDDING_CPU_INT8 = os.getenv("EMBEDDING_CPU_INT8", "0") == "1"
+QUERY_EMBEDDING_CACHE_SIZE = 2048  # Recent query embeddings kept in memory
+EMBEDDINGS_CACHE_NAME = "embedcache"  # Redis-side embeddings cache shared by all workers
+EMBEDDINGS_CACHE_TTL = 600
 
 # Search Defaults
 DEFAULT_NUM_RESULTS = 5
 DEFAULT_DISTANCE_THRESHOLD = 0.5
 DEFAULT_HYBRID_ALPHA = 0.5
+DEFAULT_RRF_K = 60  # Reciprocal Rank Fusion smoothing constant
+RRF_CANDIDATE_FACTOR = 3  # Candidates fetched per ranking, as a multiple of num_results
+HYBRID_PREFILTER_CANDIDATES = 200  # BM25 / KNN candidates for the two-stage hybrid search
 
 # Semantic Cache Configuration
 SEMANTIC_CACHE_NAME = "llmcache"
 SEMANTIC_CACHE_TTL = 3600  # 1 hour TTL for cached responses
 SEMANTIC_CACHE_DISTANCE_THRESHOLD = 0.5  # Lower = stricter matching (0.2 = 80% similarity)
+# Stored vector type for cache entries: "float32" or "float16" (half the bytes per entry).
+# Changing it requires clearing the cache index, which was created with the old type.
+CACHE_VECTOR_DTYPE = os.getenv("CACHE_VECTOR_DTYPE", "float32")
+
+# Stored type of movie vectors: "float32", "float16" (half the bytes, near-lossless)
+# or "int8" (a quarter, needs a Redis version with INT8 vector support).
+# Defaults to float32, the type existing movie indexes were created with;
+# re-run /api/create-index after changing it.
+MOVIE_VECTOR_DTYPE = os.getenv("MOVIE_VECTOR_DTYPE", "float32")
+
+# From this many movies the index is built as HNSW instead of the FLAT
+# layout below; smaller corpora scan faster than they traverse a graph
+MOVIE_HNSW_MIN_DOCS = 1000
+MOVIE_HNSW_M = 32  # Graph edges per node
+MOVIE_HNSW_EF_CONSTRUCTION = 200  # Candidate list size while building the graph
+MOVIE_MIN_EF_RUNTIME = 64  # Floor for the query-time candidate list size
 
 # Index Schema for Redis Vector Search
 INDEX_SCHEMA = {
@@ -50,7 +80,7 @@ INDEX_SCHEMA = {
                 "algorithm": "flat",
                 "dims": 384,
                 "distance_metric": "cosine",
-                "datatype": "float32",
+                "datatype": MOVIE_VECTOR_DTYPE,
             },
         },
     ],
@@ -0,0 +1,167 @@
+"""
+Shared Embedding Model
+======================
+Provides one HFTextVectorizer per process so the movie search engine, help
+center, guardrail router and semantic cache don't each load their own copy
+of the model.
+"""
+import logging
+import threading
+from collections import OrderedDict
+from typing import List
+
+import numpy as np
+
+from .config import (
+    REDIS_URL,
+    EMBEDDING_MODEL,
+    EMBEDDING_DEVICE,
+    EMBEDDING_BATCH_SIZE,
+    EMBEDDING_CPU_INT8,
+    QUERY_EMBEDDING_CACHE_SIZE,
+    EMBEDDINGS_CACHE_NAME,
+    EMBEDDINGS_CACHE_TTL,
+)
+
+logger = logging.getLogger(__name__)
+
+_vectorizer = None
+_vectorizer_lock = threading.Lock()
+
+# LRU of normalized query text -> embedding, shared by every request thread
+_query_cache: "OrderedDict[str, List[float]]" = OrderedDict()
+_query_cache_lock = threading.Lock()
+
+
+def _precision(device_type: str) -> str:
+    """Number format the model runs in on the given device type"""
+    if device_type == "cuda":
+        return "fp16"
+    return "int8" if EMBEDDING_CPU_INT8 else "fp32"
+
+
+def numeric_mode(vectorizer) -> str:
+    """
+    Device type and number format of a loaded vectorizer, e.g. "cuda/fp16".
+    
+    Vectors computed in different modes differ slightly, so anything that
+    stores embeddings long-term should record this alongside the model.
+    """
+    device_type = vectorizer._client.device.type
+    return f"{device_type}/{_precision(device_type)}"
+
+
+def _optimize_model(model) -> None:
+    """
+    Switch the SentenceTransformer to a cheaper number format for inference.
+    
+    fp16 on CUDA halves memory traffic per forward pass; on CPU, dynamic
+    int8 quantization of the Linear layers is opt-in (EMBEDDING_CPU_INT8)
+    since it changes the vectors slightly.
+    """
+    import torch
+    
+    model.eval()
+    precision = _precision(model.device.type)
+    if precision == "fp16":
+        model.half()
+    elif precision == "int8":
+        torch.ao.quantization.quantize_dynamic(
+            model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True
+        )
+
+
+def get_vectorizer():
+    """Get or create the shared HFTextVectorizer (loads the model on first call)"""
+    global _vectorizer
+    if _vectorizer is not None:
+        return _vectorizer
+    
+    # Engines may be created from several threadpool workers at once;
+    # only one of them should load the model
+    with _vectorizer_lock:
+        if _vectorizer is None:
+            # Imported here so torch/transformers only load when embeddings are needed
+            from redisvl.utils.vectorize import HFTextVectorizer
+            from redisvl.extensions.cache.embeddings import EmbeddingsCache
+            
+            _vectorizer = HFTextVectorizer(
+                model=EMBEDDING_MODEL,
+                device=EMBEDDING_DEVICE,
+                cache=EmbeddingsCache(
+                    name=EMBEDDINGS_CACHE_NAME,
+                    ttl=EMBEDDINGS_CACHE_TTL,
+                    redis_url=REDIS_URL,
+                ),
+            )
+            _optimize_model(_vectorizer._client)
+            logger.info(f"Loaded embedding model {EMBEDDING_MODEL} on {_vectorizer._client.device}")
+    return _vectorizer
+
+
+def warm_up() -> None:
+    """
+    Load the shared model and run one throwaway forward pass.
+    
+    The first encode() pays one-off costs (tokenizer setup, allocator and
+    CUDA kernel initialization) that would otherwise land on a request.
+    Bypasses both embedding caches so nothing is stored.
+    """
+    get_vectorizer()._client.encode(["warm up"], show_progress_bar=False)
+
+
+def _normalize_query(text: str) -> str:
+    # The model's tokenizer is uncased and splits on whitespace, so these
+    # variants embed identically
+    return " ".join(text.lower().split())
+
+
+def embed_query(text: str) -> List[float]:
+    """
+    Embed a single query, reusing recent results.
+    
+    Users repeat and re-submit the same questions, and the forward pass
+    is the costliest local step of a request. The returned list is shared
+    between callers and must not be modified.
+    """
+    key = _normalize_query(text)
+    with _query_cache_lock:
+        embedding = _query_cache.get(key)
+        if embedding is not None:
+            _query_cache.move_to_end(key)
+            return embedding
+    
+    # Computed outside the lock so concurrent misses don't queue behind the model
+    embedding = get_vectorizer().embed(key)
+    
+    with _query_cache_lock:
+        _query_cache[key] = embedding
+        _query_cache.move_to_end(key)
+        while len(_query_cache) > QUERY_EMBEDDING_CACHE_SIZE:
+            _query_cache.popitem(last=False)
+    return embedding
+
+
+def embed_bulk(texts: List[str], batch_size: int = EMBEDDING_BATCH_SIZE) -> np.ndarray:
+    """
+    Embed many texts straight through SentenceTransformer.encode().
+    
+    HFTextVectorizer.embed_many() slices texts into its own batches and
+    encode() then re-splits each into 32-text forward passes. Calling
+    encode() directly makes batch_size the real forward-pass size and
+    returns one float32 (N, dims) array instead of per-row lists.
+    
+    encode() also sorts the whole list by length before batching (and
+    restores input order afterwards), so each batch pads to similar
+    lengths; behind embed_many() the sort only applied within each of its
+    slices. Bulk texts also stay out of the embeddings cache.
+    """
+    model = get_vectorizer()._client
+    embeddings = model.encode(
+        texts,
+        batch_size=batch_size,
+        show_progress_bar=False,
+        convert_to_numpy=True,
+    )
+    # A model cast to fp16 on CUDA returns float16; callers expect float32
+    return embeddings.astype(np.float32, copy=False)
@@ -7,14 +7,26 @@ to StreamFlix support topics. Only one route is used to avoid false positives.
 Also provides PII detection to prevent caching of sensitive information.
 """
 import re
+import json
+import hashlib
 import logging
-from typing import Tuple, List
+import threading
+from typing import Tuple, List, TYPE_CHECKING
+
+try:
+    import hyperscan
+except ImportError:  # Optional dependency - fall back to the stdlib regex engine
+    hyperscan = None
 
-from redisvl.extensions.router import SemanticRouter, Route
-from redisvl.utils.vectorize import HFTextVectorizer
 from redis import Redis
 
+if TYPE_CHECKING:
+    from redisvl.extensions.router import Route, SemanticRouter
+    from redisvl.utils.vectorize import HFTextVectorizer
+
 from .config import REDIS_URL, EMBEDDING_MODEL
+from .embeddings import numeric_mode
+from .utils import unlink_keys
 
 logger = logging.getLogger("guardrails")
 
@@ -36,27 +48,86 @@ PII_PATTERNS = {
 }
 
 
+# Compile all patterns once at import as a single named-group alternation
+# so detect_pii() can find every PII type in one pass over the text.
+_PII_UNION = re.compile(
+    "|".join(f"(?P<{pii_type}>{pattern})" for pii_type, pattern in PII_PATTERNS.items()),
+    re.IGNORECASE,
+)
+
+# Every PII pattern needs an "@" or a digit, so text without either can be
+# rejected without running the full pattern set
+_PII_PREFILTER = re.compile(r"[@\d]")
+
+# Pattern id -> PII type, in PII_PATTERNS order
+_PII_TYPES = list(PII_PATTERNS)
+
+
+def _compile_hyperscan_db():
+    """Compile all PII patterns into one Hyperscan database, or None if unavailable."""
+    if hyperscan is None:
+        return None
+    try:
+        db = hyperscan.Database()
+        db.compile(
+            expressions=[pattern.encode() for pattern in PII_PATTERNS.values()],
+            ids=list(range(len(_PII_TYPES))),
+            elements=len(_PII_TYPES),
+            flags=[hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_SINGLEMATCH] * len(_PII_TYPES),
+        )
+        return db
+    except Exception as e:
+        logger.warning(f"Hyperscan PII database not compiled, using re fallback: {e}")
+        return None
+
+
+_PII_HS_DB = _compile_hyperscan_db()
+
+# Hyperscan scratch space must not be shared between concurrent scans
+_hs_local = threading.local()
+
+
+def _scan_hyperscan(text: str) -> set:
+    """Return the set of PII pattern ids matched by a single Hyperscan pass."""
+    scratch = getattr(_hs_local, "scratch", None)
+    if scratch is None:
+        scratch = _hs_local.scratch = hyperscan.Scratch(_PII_HS_DB)
+    
+    matched_ids = set()
+    
+    def on_match(pattern_id, start, end, flags, context):
+        matched_ids.add(pattern_id)
+    
+    _PII_HS_DB.scan(text.encode("utf-8"), match_event_handler=on_match, scratch=scratch)
+    return matched_ids
+
+
 def detect_pii(text: str) -> Tuple[bool, List[str]]:
     """
     Detect if text contains PII (Personally Identifiable Information).
     
+    Uses a Hyperscan multi-pattern database when the optional ``hyperscan``
+    package is installed, otherwise a single precompiled ``re`` alternation.
+    
     Args:
         text: Text to scan for PII
         
     Returns:
         Tuple of (contains_pii: bool, detected_types: List[str])
     """
-    if not text:
+    if not text or not _PII_PREFILTER.search(text):
         return False, []
     
-    detected_types = []
-    text_lower = text.lower()
+    if _PII_HS_DB is not None:
+        matched_ids = _scan_hyperscan(text)
+        detected_types = [_PII_TYPES[i] for i in sorted(matched_ids)]
+        return bool(detected_types), detected_types
     
-    for pii_type, pattern in PII_PATTERNS.items():
-        if re.search(pattern, text_lower if pii_type in ("account_number", "date_of_birth") else text, re.IGNORECASE):
-            detected_types.append(pii_type)
+    matches = {match.lastgroup for match in _PII_UNION.finditer(text)}
     
-    return len(detected_types) > 0, detected_types
+    # Report types in PII_PATTERNS order so log messages stay stable
+    detected_types = [pii_type for pii_type in PII_PATTERNS if pii_type in matches]
+    return bool(detected_types), detected_types
 
 
 def should_cache(query: str, response: str) -> Tuple[bool, str]:
@@ -66,6 +137,11 @@ def should_cache(query: str, response: str) -> Tuple[bool, str]:
     Checks both query and response for PII. If PII is detected in either,
     the pair should NOT be cached to protect user privacy.
     
+    Responses are always scanned, however short: an email address fits in
+    a handful of characters. Typical prose responses contain no "@" or
+    digits and are rejected by detect_pii()'s prefilter without running
+    the full pattern set.
+    
     Args:
         query: User's query
         response: LLM's response
@@ -101,45 +177,76 @@ Here are some things I can help you with:
 
 Please ask a question about StreamFlix, or visit help.streamflix.com for more options."""
 
-# Define StreamFlix support route with comprehensive reference phrases
-STREAMFLIX_ROUTE = Route(
-    name="streamflix_support",
-    references=[
-        # Account topics
-        "reset password", "forgot password", "change subscription plan",
-        "cancel subscription", "update payment method", "create profile",
-        "manage profiles", "two-factor authentication", "sign out of devices",
-        "account settings", "login issues", "email change",
-        # Playback topics
-        "video buffering", "playback quality", "audio sync", "subtitles",
-        "video error", "streaming issues", "blurry video", "freezing",
-        "captions not working", "audio language", "HD quality", "4K streaming",
-        # Content topics
-        "movie not available", "show not available", "content region",
-        "download offline", "parental controls", "continue watching",
-        "watchlist", "recommendations", "new releases", "leaving soon",
-        # Device topics
-        "supported devices", "cast to TV", "app crash", "chromecast",
-        "smart TV app", "roku", "fire stick", "apple tv", "mobile app",
-        "browser streaming", "multiple devices",
-        # Billing topics
-        "billing", "payment failed", "unexpected charge", "refund",
-        "subscription cost", "plan pricing", "free trial", "invoice",
-        # Technical topics
-        "internet speed", "contact support", "error code", "app update",
-        "connection issues", "VPN", "network requirements",
-    ],
-    distance_threshold=0.5,  # Tune based on testing (0-2 scale, lower = stricter)
-)
+# StreamFlix support route with comprehensive reference phrases. The Route
+# object itself is built in create_guardrail_router(), so importing this
+# module doesn't load redisvl's router extension.
+STREAMFLIX_ROUTE_NAME = "streamflix_support"
+STREAMFLIX_ROUTE_REFERENCES = [
+    # Account topics
+    "reset password", "forgot password", "change subscription plan",
+    "cancel subscription", "update payment method", "create profile",
+    "manage profiles", "two-factor authentication", "sign out of devices",
+    "account settings", "login issues", "email change",
+    # Playback topics
+    "video buffering", "playback quality", "audio sync", "subtitles",
+    "video error", "streaming issues", "blurry video", "freezing",
+    "captions not working", "audio language", "HD quality", "4K streaming",
+    # Content topics
+    "movie not available", "show not available", "content region",
+    "download offline", "parental controls", "continue watching",
+    "watchlist", "recommendations", "new releases", "leaving soon",
+    # Device topics
+    "supported devices", "cast to TV", "app crash", "chromecast",
+    "smart TV app", "roku", "fire stick", "apple tv", "mobile app",
+    "browser streaming", "multiple devices",
+    # Billing topics
+    "billing", "payment failed", "unexpected charge", "refund",
+    "subscription cost", "plan pricing", "free trial", "invoice",
+    # Technical topics
+    "internet speed", "contact support", "error code", "app update",
+    "connection issues", "VPN", "network requirements",
+]
+STREAMFLIX_ROUTE_DISTANCE_THRESHOLD = 0.5  # Tune based on testing (0-2 scale, lower = stricter)
+
+
+GUARDRAIL_ROUTER_NAME = "help_center_guardrail"
+DELETE_BATCH_SIZE = 500  # Keys per UNLINK command when clearing old reference vectors
+# Held (SET NX PX) while one worker checks or rebuilds the router index; not
+# under the router's "name:" prefix, which a rebuild clears
+GUARDRAIL_LOCK_NAME = f"{GUARDRAIL_ROUTER_NAME}_build_lock"
+GUARDRAIL_LOCK_TIMEOUT = 60  # Seconds before a crashed holder's lock expires
+
+# Redis key holding the fingerprint of the route references currently indexed
+GUARDRAIL_FINGERPRINT_KEY = f"{GUARDRAIL_ROUTER_NAME}:fingerprint"
+
+
+def _route_fingerprint(route: "Route", vectorizer: "HFTextVectorizer") -> str:
+    """SHA-256 over everything that determines the router's stored reference vectors"""
+    payload = json.dumps(
+        {
+            "model": vectorizer.model,
+            "numeric_mode": numeric_mode(vectorizer),
+            "route": route.name,
+            "references": route.references,
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
 
 
 def create_guardrail_router(
     redis_client: Redis,
-    vectorizer: HFTextVectorizer
-) -> SemanticRouter:
+    vectorizer: "HFTextVectorizer"
+) -> "SemanticRouter":
     """
     Create a SemanticRouter for guardrail checks.
     
+    The reference embeddings live in the router's Redis index. They are
+    only recomputed when the stored fingerprint of the model, its numeric
+    mode (device and fp16/int8 setting) and the reference phrases differs
+    from the current one; otherwise the existing index is reused and
+    startup skips embedding every reference phrase.
+    
     Args:
         redis_client: Redis connection
         vectorizer: Text vectorizer for embeddings
@@ -152,12 +259,42 @@ def create_guardrail_router(
     #
     # SemanticRouter Parameters:
     # - name: Unique name for the router index (e.g., "help_center_guardrail")
-    # - routes: List of Route objects to match against (use STREAMFLIX_ROUTE defined above)
+    # - routes: List of Route objects to match against (built below from STREAMFLIX_ROUTE_REFERENCES)
     # - vectorizer: Text vectorizer for embeddings
     # - redis_client: Redis connection
-    router = SemanticRouter(
-        name="help_center_guardrail",
-        routes=[STREAMFLIX_ROUTE],
-        vectorizer=vectorizer
+    from redisvl.extensions.router import Route, SemanticRouter
+    
+    route = Route(
+        name=STREAMFLIX_ROUTE_NAME,
+        references=STREAMFLIX_ROUTE_REFERENCES,
+        distance_threshold=STREAMFLIX_ROUTE_DISTANCE_THRESHOLD,
     )
+    
+    # Worker processes start concurrently; only one may drop and rebuild
+    # the shared index at a time, and the rest then see the new fingerprint
+    with redis_client.lock(
+        GUARDRAIL_LOCK_NAME,
+        timeout=GUARDRAIL_LOCK_TIMEOUT,
+        blocking_timeout=GUARDRAIL_LOCK_TIMEOUT,
+    ):
+        fingerprint = _route_fingerprint(route, vectorizer)
+        stored_fingerprint = redis_client.get(GUARDRAIL_FINGERPRINT_KEY)
+        stale = stored_fingerprint is None or stored_fingerprint.decode("utf-8") != fingerprint
+        
+        if stale:
+            # Drop reference keys from a previous phrase list so removed phrases don't linger
+            unlink_keys(redis_client, f"{GUARDRAIL_ROUTER_NAME}:*", DELETE_BATCH_SIZE)
+            logger.info("Guardrail route references changed - rebuilding router index")
+        
+        router = SemanticRouter(
+            name=GUARDRAIL_ROUTER_NAME,
+            routes=[route],
+            vectorizer=vectorizer,
+            redis_client=redis_client,
+            overwrite=stale,
+        )
+        
+        if stale:
+            redis_client.set(GUARDRAIL_FINGERPRINT_KEY, fingerprint)
+    
     return router
@@ -4,29 +4,56 @@ Help Center RAG Engine
 Implements semantic search over help articles with caching.
 Provides the core RAG pipeline for the Help Center bot.
 """
+import asyncio
+import copy
+import hashlib
 import json
 import logging
+import threading
+from collections import OrderedDict
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 from dataclasses import dataclass
 
+import anyio.to_thread
+import numpy as np
 from redis import Redis
+from redis.exceptions import LockError
 from redisvl.schema import IndexSchema
 from redisvl.index import SearchIndex
 from redisvl.query import VectorQuery
-from redisvl.utils.vectorize import HFTextVectorizer
 
-from openai import OpenAI
+# OpenAI is imported lazily where it is used, and the embedding model is
+# loaded on first get_vectorizer() call, so importing this module stays cheap.
 
-from .config import REDIS_URL, EMBEDDING_MODEL, OPENAI_API_KEY
-from .semantic_cache import get_semantic_cache, CacheResult
+from .config import REDIS_URL, OPENAI_API_KEY
+from .embeddings import get_vectorizer, embed_bulk, embed_query
+from .semantic_cache import get_semantic_cache, CacheResult, LLMSemanticCache
 from .guardrails import create_guardrail_router, OUT_OF_SCOPE_MESSAGE, should_cache
+from .utils import unlink_keys, mismatched_vector_attrs, TTLCache
 
 logger = logging.getLogger("help_center")
 
 # Help Center Index Configuration
 HELP_INDEX_NAME = "help_articles"
 HELP_KEY_PREFIX = "help:"
+NO_ARTICLES_MESSAGE = "I couldn't find any articles matching your question. Please try rephrasing or contact our support team for assistance."
+DELETE_BATCH_SIZE = 500  # Keys per UNLINK command when clearing articles
+# Held (SET NX PX) while one worker checks and auto-ingests the help index;
+# outside HELP_KEY_PREFIX so clearing the articles doesn't drop it
+INGEST_LOCK_NAME = f"{HELP_INDEX_NAME}:ingest_lock"
+INGEST_LOCK_TIMEOUT = 120  # Seconds before a crashed holder's lock expires
+
+# Below this many articles a FLAT (brute-force) scan is as fast as HNSW
+HELP_HNSW_MIN_ARTICLES = 1000
+HELP_EF_RUNTIME = 50  # HNSW candidate list size at query time
+INT8_SCALE = 127  # Unit-vector components in [-1, 1] map onto [-127, 127]
+
+# Storage type for help article vectors: "float16" (2 bytes/dim, near-lossless)
+# or "int8" (1 byte/dim, needs a Redis version with INT8 vector support)
+HELP_VECTOR_DTYPE = "float16"
+STATS_CACHE_TTL = 5.0  # Seconds to reuse get_stats() results
+ROUTER_CACHE_SIZE = 4096  # Max guardrail decisions kept in the exact-match LRU
 
 HELP_INDEX_SCHEMA = {
     "index": {
@@ -41,16 +68,76 @@ HELP_INDEX_SCHEMA = {
             "name": "vector",
             "type": "vector",
             "attrs": {
-                "algorithm": "flat",
+                "algorithm": "hnsw",
+                "m": 16,
+                "ef_construction": 200,
+                "ef_runtime": HELP_EF_RUNTIME,
                 "dims": 384,
-                "distance_metric": "cosine",
-                "datatype": "float32",
+                "distance_metric": "ip",  # Vectors are L2-normalized, so IP ranks like cosine
+                "datatype": HELP_VECTOR_DTYPE,
             },
         },
     ],
 }
 
 
+def _help_index_schema(num_articles: int) -> Dict[str, Any]:
+    """
+    Get the help index schema for a corpus of the given size.
+    
+    Uses HELP_INDEX_SCHEMA (HNSW) for large corpora and swaps in a FLAT
+    vector field for small ones, where graph traversal doesn't pay off.
+    """
+    if num_articles >= HELP_HNSW_MIN_ARTICLES:
+        return HELP_INDEX_SCHEMA
+    
+    schema = copy.deepcopy(HELP_INDEX_SCHEMA)
+    vector_attrs = schema["fields"][-1]["attrs"]
+    for hnsw_param in ("m", "ef_construction", "ef_runtime"):
+        vector_attrs.pop(hnsw_param)
+    vector_attrs["algorithm"] = "flat"
+    return schema
+
+
+def _normalize(vectors) -> np.ndarray:
+    """L2-normalize a single vector or an (N, dims) batch"""
+    vecs = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vecs, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vecs / norms
+
+
+def _quantize_int8(vectors) -> np.ndarray:
+    """
+    Quantize float embeddings to int8 for the help articles index.
+    
+    Accepts a single vector or an (N, dims) batch, quantized in one NumPy
+    pass. Vectors are L2-normalized and scaled by the fixed INT8_SCALE, so
+    the inner product of two codes is INT8_SCALE**2 times their cosine
+    similarity.
+    """
+    unit = _normalize(vectors)
+    return np.clip(np.round(unit * INT8_SCALE), -INT8_SCALE, INT8_SCALE).astype(np.int8)
+
+
+def _encode_vectors(vectors) -> np.ndarray:
+    """Normalize embeddings (single vector or batch) and convert them to HELP_VECTOR_DTYPE"""
+    if HELP_VECTOR_DTYPE == "int8":
+        return _quantize_int8(vectors)
+    return _normalize(vectors).astype(HELP_VECTOR_DTYPE)
+
+
+def _ip_to_similarity(distance: float) -> float:
+    """Convert an IP distance (1 - v.q) between encoded vectors to cosine similarity"""
+    scale = INT8_SCALE ** 2 if HELP_VECTOR_DTYPE == "int8" else 1
+    return (1 - distance) / scale
+
+
+async def _no_result() -> None:
+    """Placeholder awaitable for a skipped lookup in asyncio.gather()"""
+    return None
+
+
 @dataclass
 class HelpArticle:
     """Represents a help center article"""
@@ -102,14 +189,21 @@ class HelpCenterEngine:
         logger.info("Initializing HelpCenterEngine")
         
         self.client = Redis.from_url(REDIS_URL)
-        self.schema = IndexSchema.from_dict(HELP_INDEX_SCHEMA)
-        self.index = SearchIndex(self.schema, self.client)
+        # Assume a small (FLAT) index until the article count is known
+        self._set_schema(num_articles=0)
+        
+        # Share the process-wide vectorizer with the router and semantic cache
+        self.vectorizer = get_vectorizer()
+        
+        # OpenAI client for response generation, created on first use
+        self._openai_client = None
         
-        # Use same vectorizer as semantic cache for consistency
-        self.vectorizer = HFTextVectorizer(model=EMBEDDING_MODEL)
+        # Last get_stats() result
+        self._stats_cache = TTLCache(STATS_CACHE_TTL)
         
-        # Initialize OpenAI client for response generation
-        self.openai_client = OpenAI(api_key=OPENAI_API_KEY)
+        # Exact-match LRU of guardrail decisions, keyed by normalized query hash
+        self._router_lru: "OrderedDict[bytes, Any]" = OrderedDict()
+        self._router_lock = threading.Lock()
         
         # Initialize guardrail router for out-of-scope query detection
         # This may fail if the SemanticRouter challenge isn't completed yet
@@ -119,16 +213,46 @@ class HelpCenterEngine:
             logger.warning(f"Guardrail router not initialized (challenge incomplete?): {e}")
             self.router = None
         
-        # Auto-ingest articles on first run if index is empty
+        # Auto-ingest articles on first run if index is empty. Every worker
+        # process runs this at startup; the lock makes the others wait for
+        # the first one's ingest and then find the index ready
         if auto_ingest:
-            self._ensure_index_exists()
+            try:
+                with self.client.lock(
+                    INGEST_LOCK_NAME,
+                    timeout=INGEST_LOCK_TIMEOUT,
+                    blocking_timeout=INGEST_LOCK_TIMEOUT,
+                ):
+                    self._ensure_index_exists()
+            except LockError as e:
+                logger.warning(f"Help articles index not checked, ingest lock unavailable: {e}")
         
         logger.info("HelpCenterEngine initialized")
     
+    @property
+    def openai_client(self):
+        """OpenAI client, imported and created on first response generation"""
+        if self._openai_client is None:
+            from openai import OpenAI
+            self._openai_client = OpenAI(api_key=OPENAI_API_KEY)
+        return self._openai_client
+    
+    def _set_schema(self, num_articles: int) -> None:
+        """Point the engine at the help index schema sized for num_articles"""
+        self.schema = IndexSchema.from_dict(_help_index_schema(num_articles))
+        self.index = SearchIndex(self.schema, self.client)
+        self._use_hnsw = num_articles >= HELP_HNSW_MIN_ARTICLES
+    
     def _ensure_index_exists(self) -> None:
         """
-        Check if the help articles index exists and has data.
-        If not, automatically ingest articles from the default JSON file.
+        Check if the help articles index exists, has data and matches the
+        current vector layout. If not, automatically ingest articles from
+        the default JSON file.
+        
+        An index left by an older version (e.g. float32/cosine or int8)
+        would reject float16 query vectors or break _ip_to_similarity(),
+        so a mismatched datatype, metric or algorithm triggers a rebuild.
+        Settings FT.INFO doesn't report are unknown and never trigger one.
         """
         try:
             if not self.index.exists():
@@ -138,13 +262,21 @@ class HelpCenterEngine:
             
             # Check if index has any documents
             info = self.index.info()
-            num_docs = info.get("num_docs", 0)
+            num_docs = int(info.get("num_docs", 0))
             
             if num_docs == 0:
                 logger.info("Help articles index is empty - auto-ingesting articles...")
                 self.ingest_articles()
+                return
+            
+            expected = _help_index_schema(num_docs)["fields"][-1]["attrs"]
+            mismatched = mismatched_vector_attrs(info, expected)
+            if mismatched:
+                logger.info(f"Help articles index has outdated vector settings {mismatched} - re-ingesting articles...")
+                self.ingest_articles()
             else:
                 logger.info(f"Help articles index exists with {num_docs} documents")
+                self._set_schema(num_articles=num_docs)
                 
         except Exception as e:
             logger.warning(f"Could not check index status, attempting to ingest: {e}")
@@ -181,16 +313,18 @@ class HelpCenterEngine:
         logger.info(f"Found {len(articles)} articles")
         
         # Clear existing help articles
-        existing_keys = list(self.client.scan_iter(match=f"{HELP_KEY_PREFIX}*"))
-        if existing_keys:
-            logger.info(f"Deleting {len(existing_keys)} existing articles")
-            self.client.delete(*existing_keys)
+        num_deleted = unlink_keys(self.client, f"{HELP_KEY_PREFIX}*", DELETE_BATCH_SIZE)
+        if num_deleted:
+            logger.info(f"Deleted {num_deleted} existing articles")
         
         # Delete existing index
         if self.index.exists():
             logger.info(f"Dropping existing index: {HELP_INDEX_NAME}")
             self.index.delete()
         
+        # Pick FLAT or HNSW for the new index based on corpus size
+        self._set_schema(num_articles=len(articles))
+        
         # Generate embeddings for all articles
         # Combine title and content for richer embeddings
         texts_to_embed = [
@@ -199,24 +333,28 @@ class HelpCenterEngine:
         ]
         
         logger.info("Generating embeddings...")
-        embeddings = self.vectorizer.embed_many(texts_to_embed, as_buffer=True)
+        embeddings = _encode_vectors(embed_bulk(texts_to_embed))
         
-        # Store articles in Redis
+        # Store articles in Redis, pipelined into a single round-trip
         logger.info("Storing articles in Redis...")
+        pipe = self.client.pipeline(transaction=False)
         for article, embedding in zip(articles, embeddings):
             key = f"{HELP_KEY_PREFIX}{article['id']}"
-            self.client.hset(key, mapping={
+            pipe.hset(key, mapping={
                 "id": article["id"],
                 "title": article["title"],
                 "category": article["category"],
                 "content": article["content"],
-                "vector": embedding,
+                "vector": embedding.tobytes(),
             })
+        pipe.execute()
         
         # Create the search index
         logger.info(f"Creating index: {HELP_INDEX_NAME}")
         self.index.create(overwrite=True)
         
+        self._stats_cache.clear()  # Article count changed
+        
         logger.info(f"Successfully ingested {len(articles)} articles")
         return {
             "status": "success",
@@ -227,7 +365,8 @@ class HelpCenterEngine:
     def search_articles(
         self, 
         query: str, 
-        num_results: int = 3
+        num_results: int = 3,
+        query_embedding: Optional[List[float]] = None,
     ) -> List[HelpArticle]:
         """
         Search for relevant help articles using vector similarity.
@@ -235,22 +374,26 @@ class HelpCenterEngine:
         Args:
             query: User's question
             num_results: Number of articles to return
+            query_embedding: Precomputed embedding of the query (skips re-embedding)
             
         Returns:
             List of matching HelpArticle objects
         """
         logger.info(f"Searching for: '{query[:50]}...'")
         
-        # Generate embedding for query
-        query_embedding = self.vectorizer.embed(query)
+        # Generate embedding for query unless the caller already has one
+        if query_embedding is None:
+            query_embedding = embed_query(query)
         
         # Create vector query
         vec_query = VectorQuery(
-            vector=query_embedding,
+            vector=_encode_vectors(query_embedding).tobytes(),
             vector_field_name="vector",
+            dtype=HELP_VECTOR_DTYPE,
             num_results=num_results,
             return_fields=["id", "title", "category", "content"],
             return_score=True,
+            ef_runtime=HELP_EF_RUNTIME if self._use_hnsw else None,
         )
         
         # Execute search
@@ -260,7 +403,7 @@ class HelpCenterEngine:
         articles = []
         for result in results:
             distance = float(result.get("vector_distance", 0))
-            similarity = 1 - distance
+            similarity = _ip_to_similarity(distance)
             
             articles.append(HelpArticle(
                 id=result.get("id", ""),
@@ -273,23 +416,8 @@ class HelpCenterEngine:
         logger.info(f"Found {len(articles)} matching articles")
         return articles
     
-    def generate_response(self, query: str, articles: List[HelpArticle]) -> tuple[str, Optional[TokenUsage]]:
-        """
-        Generate a helpful response based on retrieved articles using OpenAI.
-        
-        Uses an LLM to synthesize information from retrieved help articles
-        into a natural, conversational response.
-        
-        Args:
-            query: User's original question
-            articles: List of relevant articles
-            
-        Returns:
-            Tuple of (generated response text, token usage)
-        """
-        if not articles:
-            return ("I couldn't find any articles matching your question. Please try rephrasing or contact our support team for assistance.", None)
-        
+    def _build_messages(self, query: str, articles: List[HelpArticle]) -> List[Dict[str, str]]:
+        """Build the chat messages (system prompt + article context + question) for the LLM"""
         # Build context from retrieved articles
         context_parts = []
         for i, article in enumerate(articles, 1):
@@ -322,13 +450,32 @@ HELP ARTICLES:
 USER QUESTION: {query}
 
 Please provide a helpful, conversational response that addresses the user's question using the information from the articles above."""
-
+        
+        return [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt}
+        ]
+    
+    def generate_response(self, query: str, articles: List[HelpArticle]) -> tuple[str, Optional[TokenUsage]]:
+        """
+        Generate a helpful response based on retrieved articles using OpenAI.
+        
+        Uses an LLM to synthesize information from retrieved help articles
+        into a natural, conversational response.
+        
+        Args:
+            query: User's original question
+            articles: List of relevant articles
+            
+        Returns:
+            Tuple of (generated response text, token usage)
+        """
+        if not articles:
+            return (NO_ARTICLES_MESSAGE, None)
+        
         response = self.openai_client.chat.completions.create(
             model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
+            messages=self._build_messages(query, articles),
             temperature=0.7,
             max_tokens=500,
         )
@@ -345,6 +492,146 @@ Please provide a helpful, conversational response that addresses the user's ques
         logger.info(f"Generated LLM response for query: '{query[:50]}...' (tokens: {token_usage.total_tokens})")
         return (generated_text, token_usage)
     
+    def stream_response(self, query: str, articles: List[HelpArticle]) -> Iterator[str]:
+        """
+        Stream a response based on retrieved articles using OpenAI.
+        
+        Same prompt as generate_response(), but yields text as the LLM
+        emits it so the first tokens reach the user before generation ends.
+        
+        Args:
+            query: User's original question
+            articles: List of relevant articles
+            
+        Yields:
+            Chunks of generated response text
+        """
+        if not articles:
+            yield NO_ARTICLES_MESSAGE
+            return
+        
+        stream = self.openai_client.chat.completions.create(
+            model="gpt-4o-mini",
+            messages=self._build_messages(query, articles),
+            temperature=0.7,
+            max_tokens=500,
+            stream=True,
+            stream_options={"include_usage": True},
+        )
+        
+        total_tokens = None
+        for chunk in stream:
+            # The final chunk carries token usage and no choices
+            if chunk.usage is not None:
+                total_tokens = chunk.usage.total_tokens
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+        
+        logger.info(f"Streamed LLM response for query: '{query[:50]}...' (tokens: {total_tokens})")
+    
+    def _route(self, query: str, query_embedding: List[float]):
+        """
+        Get the guardrail RouteMatch for a query, serving repeats from an in-process LRU.
+        
+        Queries are keyed by a hash of their stripped, lowercased text, so
+        verbatim repeats (FAQs, copy-paste) skip the router's Redis lookup.
+        """
+        key = hashlib.sha1(query.strip().lower().encode("utf-8")).digest()
+        with self._router_lock:
+            route_match = self._router_lru.get(key)
+            if route_match is not None:
+                self._router_lru.move_to_end(key)
+                return route_match
+        
+        route_match = self.router(vector=query_embedding)
+        
+        with self._router_lock:
+            self._router_lru[key] = route_match
+            if len(self._router_lru) > ROUTER_CACHE_SIZE:
+                self._router_lru.popitem(last=False)
+        return route_match
+    
+    def _guardrail_response(self, query: str, route_match) -> Optional[ChatResponse]:
+        """Return the out-of-scope response if the guardrail rejected the query"""
+        # Skip if router not initialized (challenge not completed)
+        if route_match is None:
+            logger.debug("Guardrail check skipped - router not initialized")
+            return None
+        
+        if route_match.name is None:  # No match within threshold
+            logger.info(f"Query blocked by guardrail: '{query[:50]}...' (distance: {route_match.distance})")
+            return ChatResponse(
+                answer=OUT_OF_SCOPE_MESSAGE,
+                sources=[],
+                from_cache=False,
+                blocked=True,
+            )
+        
+        logger.info(f"Query allowed: matched '{route_match.name}' (distance: {route_match.distance})")
+        return None
+    
+    def _get_cache(self, use_cache: bool) -> Optional[LLMSemanticCache]:
+        """Get the semantic cache, or None if disabled or not initialized (challenge not completed)"""
+        cache = get_semantic_cache() if use_cache else None
+        if cache is None and use_cache:
+            logger.debug("Cache check skipped - cache not initialized")
+        return cache
+    
+    def _cached_response(self, cache_result: Optional[CacheResult]) -> Optional[ChatResponse]:
+        """Return the cached answer as a ChatResponse on a cache hit"""
+        if cache_result is None or not cache_result.hit:
+            return None
+        
+        logger.info("Cache hit - returning cached response")
+        return ChatResponse(
+            answer=cache_result.response,
+            sources=[],  # No sources for cached responses
+            from_cache=True,
+            cache_similarity=cache_result.similarity,
+        )
+    
+    def _check_guardrail_and_cache(
+        self,
+        query: str,
+        use_cache: bool,
+    ) -> Tuple[Optional[ChatResponse], Optional[LLMSemanticCache], List[float]]:
+        """
+        Run the guardrail and semantic cache steps shared by chat() and chat_stream().
+        
+        Returns:
+            Tuple of (early response if blocked or cached, cache to store into, query embedding)
+        """
+        # Embed the query once and share it with the router, cache and search
+        query_embedding = embed_query(query)
+        
+        # Step 0: Check guardrails - is this a StreamFlix-related question?
+        route_match = self._route(query, query_embedding) if self.router is not None else None
+        blocked_response = self._guardrail_response(query, route_match)
+        if blocked_response is not None:
+            return blocked_response, None, query_embedding
+        
+        # Step 1: Check semantic cache
+        cache = self._get_cache(use_cache)
+        cache_result = cache.check(query, vector=query_embedding) if cache is not None else None
+        return self._cached_response(cache_result), cache, query_embedding
+    
+    def _store_in_cache(
+        self,
+        cache: Optional[LLMSemanticCache],
+        query: str,
+        response_text: str,
+        query_embedding: Optional[List[float]] = None
+    ) -> None:
+        """Store a generated response in the cache (only if no PII detected and cache is available)"""
+        if cache is None:
+            return
+        
+        can_cache, cache_reason = should_cache(query, response_text)
+        if can_cache:
+            cache.store(query, response_text, vector=query_embedding)
+        else:
+            logger.info(f"Skipping cache storage: {cache_reason}")
+    
     def chat(self, query: str, use_cache: bool = True) -> ChatResponse:
         """
         Main chat endpoint - processes a user question with caching.
@@ -358,54 +645,70 @@ Please provide a helpful, conversational response that addresses the user's ques
         """
         logger.info(f"Processing chat: '{query[:50]}...'")
         
-        # Step 0: Check guardrails - is this a StreamFlix-related question?
-        # Skip if router not initialized (challenge not completed)
-        if self.router is not None:
-            route_match = self.router(query)
-            
-            if route_match.name is None:  # No match within threshold
-                logger.info(f"Query blocked by guardrail: '{query[:50]}...' (distance: {route_match.distance})")
-                return ChatResponse(
-                    answer=OUT_OF_SCOPE_MESSAGE,
-                    sources=[],
-                    from_cache=False,
-                    blocked=True,
-                )
-            
-            logger.info(f"Query allowed: matched '{route_match.name}' (distance: {route_match.distance})")
-        else:
-            logger.debug("Guardrail check skipped - router not initialized")
+        early_response, cache, query_embedding = self._check_guardrail_and_cache(query, use_cache)
+        if early_response is not None:
+            return early_response
         
-        # Step 1: Check semantic cache
-        # Skip if cache not initialized (challenge not completed)
-        cache = get_semantic_cache() if use_cache else None
-        if cache is not None:
-            cache_result = cache.check(query)
+        # Step 2: Search for relevant articles
+        articles = self.search_articles(query, num_results=3, query_embedding=query_embedding)
+        
+        # Step 3: Generate response
+        response_text, token_usage = self.generate_response(query, articles)
+        
+        # Step 4: Store in cache
+        self._store_in_cache(cache, query, response_text, query_embedding)
+        
+        return ChatResponse(
+            answer=response_text,
+            sources=articles,
+            token_usage=token_usage,
+            from_cache=False,
+        )
+    
+    async def achat(self, query: str, use_cache: bool = True) -> ChatResponse:
+        """
+        Async variant of chat() for the API layer.
+        
+        Once the query is embedded, the guardrail lookup and the semantic
+        cache check are independent Redis queries, so they run concurrently.
+        Blocking steps run in worker threads to keep the event loop free,
+        on anyio's thread limiter (sized by the app's THREADPOOL_SIZE)
+        rather than asyncio's small default executor.
+        
+        Args:
+            query: User's question
+            use_cache: Whether to use semantic cache
             
-            if cache_result.hit:
-                logger.info("Cache hit - returning cached response")
-                return ChatResponse(
-                    answer=cache_result.response,
-                    sources=[],  # No sources for cached responses
-                    from_cache=True,
-                    cache_similarity=cache_result.similarity,
-                )
-        elif use_cache:
-            logger.debug("Cache check skipped - cache not initialized")
+        Returns:
+            ChatResponse with answer, sources, and cache status
+        """
+        logger.info(f"Processing chat: '{query[:50]}...'")
+        
+        query_embedding = await anyio.to_thread.run_sync(embed_query, query)
+        cache = await anyio.to_thread.run_sync(self._get_cache, use_cache)
+        
+        # Steps 0 + 1: guardrail and semantic cache lookups in parallel
+        route_match, cache_result = await asyncio.gather(
+            anyio.to_thread.run_sync(self._route, query, query_embedding) if self.router is not None else _no_result(),
+            anyio.to_thread.run_sync(cache.check, query, query_embedding) if cache is not None else _no_result(),
+        )
+        
+        blocked_response = self._guardrail_response(query, route_match)
+        if blocked_response is not None:
+            return blocked_response
+        
+        cached_response = self._cached_response(cache_result)
+        if cached_response is not None:
+            return cached_response
         
         # Step 2: Search for relevant articles
-        articles = self.search_articles(query, num_results=3)
+        articles = await anyio.to_thread.run_sync(self.search_articles, query, 3, query_embedding)
         
         # Step 3: Generate response
-        response_text, token_usage = self.generate_response(query, articles)
+        response_text, token_usage = await anyio.to_thread.run_sync(self.generate_response, query, articles)
         
-        # Step 4: Store in cache (only if no PII detected and cache is available)
-        if cache is not None:
-            can_cache, cache_reason = should_cache(query, response_text)
-            if can_cache:
-                cache.store(query, response_text)
-            else:
-                logger.info(f"Skipping cache storage: {cache_reason}")
+        # Step 4: Store in cache
+        await anyio.to_thread.run_sync(self._store_in_cache, cache, query, response_text, query_embedding)
         
         return ChatResponse(
             answer=response_text,
@@ -414,8 +717,42 @@ Please provide a helpful, conversational response that addresses the user's ques
             from_cache=False,
         )
     
+    def chat_stream(self, query: str, use_cache: bool = True) -> Iterator[str]:
+        """
+        Streaming variant of chat() - yields the answer text as it is generated.
+        
+        Blocked and cached answers are yielded as a single chunk. A generated
+        answer is stored in the cache once the stream completes.
+        
+        Args:
+            query: User's question
+            use_cache: Whether to use semantic cache
+            
+        Yields:
+            Chunks of answer text
+        """
+        logger.info(f"Processing streaming chat: '{query[:50]}...'")
+        
+        early_response, cache, query_embedding = self._check_guardrail_and_cache(query, use_cache)
+        if early_response is not None:
+            yield early_response.answer
+            return
+        
+        articles = self.search_articles(query, num_results=3, query_embedding=query_embedding)
+        
+        response_parts = []
+        for text in self.stream_response(query, articles):
+            response_parts.append(text)
+            yield text
+        
+        self._store_in_cache(cache, query, "".join(response_parts), query_embedding)
+    
     def get_stats(self) -> Dict[str, Any]:
-        """Get help center statistics"""
+        """Get help center statistics (cached for STATS_CACHE_TTL seconds)"""
+        return self._stats_cache.get(self._fetch_stats)
+    
+    def _fetch_stats(self) -> Dict[str, Any]:
+        """Read help center statistics from Redis"""
         try:
             index_exists = self.index.exists()
             if index_exists:
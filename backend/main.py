@@ -4,55 +4,171 @@ Provides REST API endpoints for various search methods
 """
 import time
 import os
-from typing import Optional, List, Dict, Any
-from fastapi import FastAPI, HTTPException, Query
+import logging
+from contextlib import asynccontextmanager
+from dataclasses import asdict, is_dataclass
+
+import msgpack
+import orjson
+from typing import Optional, List, Dict, Any, Tuple, Literal
+import anyio.to_thread
+from fastapi import FastAPI, HTTPException, Query, Depends, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field
+from starlette.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from pydantic import BaseModel, ConfigDict, Field
 
-from redis import Redis
+import redis.asyncio as aioredis
 
 from .search_engine import get_search_engine, MovieSearchEngine
 from .semantic_cache import get_semantic_cache, LLMSemanticCache
 from .help_center import get_help_engine, HelpCenterEngine, HelpArticle
-from .config import REDIS_URL, DEFAULT_NUM_RESULTS, DEFAULT_HYBRID_ALPHA, DEFAULT_DISTANCE_THRESHOLD
+from .embeddings import warm_up as warm_up_embeddings
+from .config import REDIS_URL, INDEX_NAME, DEFAULT_NUM_RESULTS, DEFAULT_HYBRID_ALPHA, DEFAULT_DISTANCE_THRESHOLD, DEFAULT_RRF_K
+
+logger = logging.getLogger(__name__)
+
+# Shared async Redis connection pool for handlers that talk to Redis directly
+_redis_pool = aioredis.ConnectionPool.from_url(REDIS_URL, max_connections=32)
+_async_redis = aioredis.Redis(connection_pool=_redis_pool)
+
+
+# Search, cache and ingest calls block on Redis/model inference, so handlers
+# run them in Starlette's threadpool; raise its size from anyio's default of 40
+THREADPOOL_SIZE = int(os.getenv("THREADPOOL_SIZE", "100"))
+
+
+async def _warm_up(name: str, factory) -> None:
+    """Create an engine singleton off the event loop, logging instead of failing startup"""
+    try:
+        await run_in_threadpool(factory)
+        logger.info(f"{name} initialized at startup")
+    except Exception as e:
+        # Leave it to the first request to retry (e.g. schema challenge not done yet)
+        logger.warning(f"{name} not initialized at startup: {e}")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Initialize engines before serving and release Redis connections on shutdown.
+    
+    Loading the embedding model and connecting to Redis up front means the
+    first request after a (re)start doesn't pay for it.
+    """
+    anyio.to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_SIZE
+    
+    await _warm_up("MovieSearchEngine", get_search_engine)
+    await _warm_up("LLMSemanticCache", get_semantic_cache)
+    await _warm_up("HelpCenterEngine", get_help_engine)
+    await _warm_up("Embedding model", warm_up_embeddings)
+    
+    # Build the OpenAPI document now (FastAPI caches it on the app), which
+    # generates every request/response model's JSON schema up front
+    app.openapi()
+    
+    yield
+    
+    await _async_redis.aclose()
+    await _redis_pool.disconnect()
+
 
 # Initialize FastAPI app
 app = FastAPI(
     title="Movie Recommender API",
     description="Redis Vector Search powered movie recommendation engine",
     version="1.0.0",
+    default_response_class=ORJSONResponse,  # orjson encodes result payloads in C
+    lifespan=lifespan,
 )
 
+
 # Configure CORS for React frontend (localhost + Codespaces)
-def get_allowed_origins():
-    """Build list of allowed CORS origins for both local and Codespaces environments."""
-    origins = [
-        "http://localhost:5173",  # Vite dev server
-        "http://localhost:3000",  # Docker/production frontend
-    ]
+# Origins are fixed for the process lifetime, so they're computed once here
+_CODESPACE_NAME = os.getenv("CODESPACE_NAME")
+
+ALLOWED_ORIGINS: tuple[str, ...] = (
+    "http://localhost:5173",  # Vite dev server
+    "http://localhost:3000",  # Docker/production frontend
+) + (
+    # Codespaces origins if running in GitHub Codespaces
+    (
+        f"https://{_CODESPACE_NAME}-5173.app.github.dev",
+        f"https://{_CODESPACE_NAME}-3000.app.github.dev",
+        f"https://{_CODESPACE_NAME}-8000.app.github.dev",
+    )
+    if _CODESPACE_NAME else ()
+)
+
+
+class ResponseTimeMiddleware:
+    """
+    Add an X-Response-Time header (in milliseconds) to every HTTP response.
+    
+    Plain ASGI rather than @app.middleware("http") so streaming responses
+    pass through unbuffered; the time is taken when headers are sent.
+    """
     
-    # Add Codespaces origins if running in GitHub Codespaces
-    codespace_name = os.getenv("CODESPACE_NAME")
-    if codespace_name:
-        origins.extend([
-            f"https://{codespace_name}-5173.app.github.dev",
-            f"https://{codespace_name}-3000.app.github.dev",
-            f"https://{codespace_name}-8000.app.github.dev",
-        ])
+    def __init__(self, app: ASGIApp):
+        self.app = app
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        start_ns = time.perf_counter_ns()
+        
+        async def send_with_timing(message: Message):
+            if message["type"] == "http.response.start":
+                elapsed_ms = (time.perf_counter_ns() - start_ns) // 1_000_000
+                headers = list(message.get("headers", []))
+                headers.append((b"x-response-time", f"{elapsed_ms}ms".encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+        
+        await self.app(scope, receive, send_with_timing)
+
+
+class CompressionMiddleware(GZipMiddleware):
+    """
+    Gzip JSON responses, except streaming endpoints.
+    
+    GZip holds small chunks in the compressor until it has enough to emit,
+    which would turn a token-by-token stream back into one delayed blob.
+    """
     
-    return origins
+    UNCOMPRESSED_PATHS = frozenset({"/api/help/chat/stream"})
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] == "http" and scope["path"] in self.UNCOMPRESSED_PATHS:
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
 
+# Middleware added last runs first: CORS -> response time -> compression
+app.add_middleware(CompressionMiddleware, minimum_size=1024, compresslevel=5)
+app.add_middleware(ResponseTimeMiddleware)
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=get_allowed_origins(),
+    allow_origins=list(ALLOWED_ORIGINS),
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Response-Time"],
 )
 
 
 # Request/Response Models
+# Models are read-only once built. Responses are returned as ORJSONResponse
+# dicts so FastAPI doesn't re-validate them; the response models document
+# the payload shapes in OpenAPI.
 class SearchRequest(BaseModel):
+    model_config = ConfigDict(frozen=True)
+    
     query: str = Field(..., description="Search query text")
     num_results: int = Field(DEFAULT_NUM_RESULTS, ge=1, le=50, description="Number of results")
 
@@ -64,6 +180,11 @@ class FilteredSearchRequest(SearchRequest):
 
 class HybridSearchRequest(SearchRequest):
     alpha: float = Field(DEFAULT_HYBRID_ALPHA, ge=0, le=1, description="Balance between vector (1) and text (0)")
+    fusion: Literal["weighted", "rrf", "prefilter"] = Field(
+        "weighted",
+        description="Score fusion: alpha-weighted, Reciprocal Rank Fusion, or BM25 pre-filter then alpha-weighted vector rank",
+    )
+    rrf_k: int = Field(DEFAULT_RRF_K, ge=1, description="RRF smoothing constant (fusion=rrf only)")
 
 
 class RangeSearchRequest(SearchRequest):
@@ -71,6 +192,8 @@ class RangeSearchRequest(SearchRequest):
 
 
 class MovieResult(BaseModel):
+    model_config = ConfigDict(frozen=True)
+    
     title: str
     genre: str
     rating: Any
@@ -84,49 +207,155 @@ class MovieResult(BaseModel):
 
 
 class SearchResponse(BaseModel):
+    model_config = ConfigDict(frozen=True)
+    
     results: List[MovieResult]
     count: int
     search_type: str
 
 
 class HealthResponse(BaseModel):
+    model_config = ConfigDict(frozen=True)
+    
     status: str
     redis_connected: bool
     index_exists: bool
     index_info: Dict[str, Any]
 
 
+def _search_response(results: List[Dict[str, Any]], search_type: str) -> ORJSONResponse:
+    """
+    Build a SearchResponse-shaped payload without Pydantic validation.
+    
+    Results come from the search engine already formatted, so they're
+    encoded directly; response_model is kept on the endpoints for OpenAPI.
+    """
+    return ORJSONResponse({
+        "results": results,
+        "count": len(results),
+        "search_type": search_type,
+    })
+
+
 # Dependency to get search engine
-def get_engine() -> MovieSearchEngine:
-    try:
-        return get_search_engine()
-    except Exception as e:
-        raise HTTPException(status_code=503, detail=f"Search engine unavailable: {str(e)}")
+_engine: Optional[MovieSearchEngine] = None
+
+
+async def get_engine() -> MovieSearchEngine:
+    """
+    Resolve the search engine, mapping initialization failures to a 503.
+    
+    Once created the engine is returned straight from the module global, so
+    later requests skip both the threadpool hop FastAPI uses for sync
+    dependencies and the exception handling.
+    """
+    global _engine
+    if _engine is None:
+        try:
+            _engine = await run_in_threadpool(get_search_engine)
+        except Exception as e:
+            raise HTTPException(status_code=503, detail=f"Search engine unavailable: {str(e)}")
+    return _engine
+
+
+_cache: Optional[LLMSemanticCache] = None
+_help_engine: Optional[HelpCenterEngine] = None
+
+
+async def get_cache() -> LLMSemanticCache:
+    """
+    Resolve the semantic cache like get_engine().
+    
+    If startup couldn't create it, the retry loads the model off the event
+    loop instead of blocking every other request.
+    """
+    global _cache
+    if _cache is None:
+        _cache = await run_in_threadpool(get_semantic_cache)
+        if _cache is None:
+            raise HTTPException(status_code=503, detail="Semantic cache unavailable")
+    return _cache
+
+
+async def get_help() -> HelpCenterEngine:
+    """
+    Resolve the help center engine like get_engine().
+    
+    A retry after a failed startup may load the model, ingest articles and
+    wait on the ingest lock, so it runs in the threadpool.
+    """
+    global _help_engine
+    if _help_engine is None:
+        try:
+            _help_engine = await run_in_threadpool(get_help_engine)
+        except Exception as e:
+            raise HTTPException(status_code=503, detail=f"Help center unavailable: {str(e)}")
+    return _help_engine
+
+
+def _decode(value: Any) -> Any:
+    return value.decode("utf-8") if isinstance(value, bytes) else value
+
+
+def _parse_ft_info(raw: Any) -> Dict[str, Any]:
+    """Pick the index info fields reported by get_index_info() out of a raw FT.INFO reply"""
+    if isinstance(raw, dict):
+        info = {_decode(k): v for k, v in raw.items()}
+    else:
+        info = {_decode(k): v for k, v in zip(raw[::2], raw[1::2])}
+    return {
+        "name": _decode(info.get("index_name", INDEX_NAME)),
+        "num_docs": int(float(_decode(info.get("num_docs", 0)))),
+        "indexing": int(float(_decode(info.get("indexing", 0)))),
+    }
+
+
+async def _health_probe() -> Tuple[bool, bool, Dict[str, Any]]:
+    """
+    PING and FT.INFO the movies index in one pipelined round-trip.
+    
+    Returns:
+        Tuple of (redis_connected, index_exists, index_info)
+    """
+    pipe = _async_redis.pipeline(transaction=False)
+    pipe.ping()
+    pipe.execute_command("FT.INFO", INDEX_NAME)
+    ping_result, info_result = await pipe.execute(raise_on_error=False)
+    
+    if isinstance(ping_result, Exception):
+        raise ping_result
+    if isinstance(info_result, Exception):
+        # Most likely "Unknown index name" - Redis is up but the index isn't created yet
+        return bool(ping_result), False, {"error": str(info_result)}
+    return bool(ping_result), True, _parse_ft_info(info_result)
 
 
 # API Endpoints
 @app.get("/api/health", response_model=HealthResponse, tags=["Health"])
 async def health_check():
     """Check API and Redis connection health"""
-    # First, check Redis connection directly (independent of schema configuration)
-    redis_connected = False
     try:
-        client = Redis.from_url(REDIS_URL)
-        redis_connected = client.ping()
+        redis_connected, index_exists, index_info = await _health_probe()
     except Exception:
+        # Fall back to separate checks so a partial failure is still reported
+        # First, check Redis connection directly (independent of schema configuration)
         redis_connected = False
-    
-    # Then try to check index status (requires valid schema from Challenge 1)
-    index_exists = False
-    index_info = {}
-    
-    try:
-        engine = get_engine()
-        index_exists = engine.check_index_exists()
-        index_info = engine.get_index_info()
-    except Exception as e:
-        # Schema or engine initialization failed, but Redis might still be connected
-        index_info = {"error": str(e), "hint": "Complete Challenge 1 to configure the index schema"}
+        try:
+            redis_connected = await _async_redis.ping()
+        except Exception:
+            redis_connected = False
+        
+        # Then try to check index status (requires valid schema from Challenge 1)
+        index_exists = False
+        index_info = {}
+        
+        try:
+            engine = await get_engine()
+            index_exists = await run_in_threadpool(engine.check_index_exists)
+            index_info = await run_in_threadpool(engine.get_index_info)
+        except Exception as e:
+            # Schema or engine initialization failed, but Redis might still be connected
+            index_info = {"error": str(e), "hint": "Complete Challenge 1 to configure the index schema"}
     
     # Determine overall status
     if redis_connected and index_exists:
@@ -136,115 +365,94 @@ async def health_check():
     else:
         status = "unhealthy"
     
-    return HealthResponse(
-        status=status,
-        redis_connected=redis_connected,
-        index_exists=index_exists,
-        index_info=index_info,
-    )
+    return ORJSONResponse({
+        "status": status,
+        "redis_connected": redis_connected,
+        "index_exists": index_exists,
+        "index_info": index_info,
+    })
 
 
 @app.post("/api/search/vector", response_model=SearchResponse, tags=["Search"])
-async def vector_search(request: SearchRequest):
+async def vector_search(request: SearchRequest, engine: MovieSearchEngine = Depends(get_engine)):
     """
     Semantic vector search using KNN
     Returns movies most similar to the query meaning
     """
-    engine = get_engine()
-    results = engine.vector_search(request.query, request.num_results)
+    results = await run_in_threadpool(engine.vector_search, request.query, request.num_results)
     
-    return SearchResponse(
-        results=results,
-        count=len(results),
-        search_type="vector",
-    )
+    return _search_response(results, "vector")
 
 
 @app.post("/api/search/filtered", response_model=SearchResponse, tags=["Search"])
-async def filtered_search(request: FilteredSearchRequest):
+async def filtered_search(request: FilteredSearchRequest, engine: MovieSearchEngine = Depends(get_engine)):
     """
     Vector search with genre and rating filters
     Combines semantic similarity with metadata filtering
     """
-    engine = get_engine()
-    results = engine.filtered_search(
+    results = await run_in_threadpool(
+        engine.filtered_search,
         query=request.query,
         genre=request.genre,
         min_rating=request.min_rating,
         num_results=request.num_results,
     )
     
-    return SearchResponse(
-        results=results,
-        count=len(results),
-        search_type="filtered",
-    )
+    return _search_response(results, "filtered")
 
 
 @app.post("/api/search/keyword", response_model=SearchResponse, tags=["Search"])
-async def keyword_search(request: SearchRequest):
+async def keyword_search(request: SearchRequest, engine: MovieSearchEngine = Depends(get_engine)):
     """
     Full-text keyword search using BM25
     Returns movies matching exact keywords in description
     """
-    engine = get_engine()
-    results = engine.keyword_search(request.query, request.num_results)
+    results = await run_in_threadpool(engine.keyword_search, request.query, request.num_results)
     
-    return SearchResponse(
-        results=results,
-        count=len(results),
-        search_type="keyword",
-    )
+    return _search_response(results, "keyword")
 
 
 @app.post("/api/search/hybrid", response_model=SearchResponse, tags=["Search"])
-async def hybrid_search(request: HybridSearchRequest):
+async def hybrid_search(request: HybridSearchRequest, engine: MovieSearchEngine = Depends(get_engine)):
     """
     Hybrid search combining vector and keyword
     Alpha controls balance: 1.0 = pure vector, 0.0 = pure text
     """
-    engine = get_engine()
-    results = engine.hybrid_search(
+    results = await run_in_threadpool(
+        engine.hybrid_search,
         query=request.query,
         alpha=request.alpha,
         num_results=request.num_results,
+        fusion=request.fusion,
+        rrf_k=request.rrf_k,
     )
     
-    return SearchResponse(
-        results=results,
-        count=len(results),
-        search_type="hybrid",
-    )
+    return _search_response(results, "hybrid")
 
 
 @app.post("/api/search/range", response_model=SearchResponse, tags=["Search"])
-async def range_search(request: RangeSearchRequest):
+async def range_search(request: RangeSearchRequest, engine: MovieSearchEngine = Depends(get_engine)):
     """
     Range query with distance threshold
     Only returns results within semantic distance threshold
     """
-    engine = get_engine()
-    results = engine.range_search(
+    results = await run_in_threadpool(
+        engine.range_search,
         query=request.query,
         distance_threshold=request.distance_threshold,
         num_results=request.num_results,
     )
     
-    return SearchResponse(
-        results=results,
-        count=len(results),
-        search_type="range",
-    )
+    return _search_response(results, "range")
 
 
 @app.post("/api/clear-data", tags=["Admin"])
-async def clear_data():
+async def clear_data(engine: MovieSearchEngine = Depends(get_engine)):
     """
     Clear all movie data and search index from Redis.
     Run this before re-importing data with RIOT.
     """
-    engine = get_engine()
-    success = engine.clear_all_data()
+    success = await run_in_threadpool(engine.clear_all_data)
     
     if success:
         return {"status": "success", "message": "All movie data and index cleared"}
@@ -253,7 +461,7 @@ async def clear_data():
 
 
 @app.post("/api/create-index", tags=["Admin"])
-async def create_index():
+async def create_index(engine: MovieSearchEngine = Depends(get_engine)):
     """
     Create embeddings and search index from RIOT-imported data.
     
@@ -261,8 +469,7 @@ async def create_index():
     - Run RIOT import first: ./scripts/import_data.sh
     - This reads movie:* keys from Redis, generates embeddings, and creates the search index
     """
-    engine = get_engine()
-    success = engine.create_embeddings_and_index()
+    success = await run_in_threadpool(engine.create_embeddings_and_index)
     
     if success:
         return {"status": "success", "message": "Embeddings and search index created successfully"}
@@ -275,15 +482,21 @@ async def create_index():
 # ============================================================================
 
 class CacheQueryRequest(BaseModel):
+    model_config = ConfigDict(frozen=True)
+    
     query: str = Field(..., description="Query to check in semantic cache")
 
 
 class CacheStoreRequest(BaseModel):
+    model_config = ConfigDict(frozen=True)
+    
     query: str = Field(..., description="Query to cache")
     response: str = Field(..., description="Response to cache")
 
 
 class CacheQueryResponse(BaseModel):
+    model_config = ConfigDict(frozen=True)
+    
     hit: bool
     query: str
     response: Optional[str] = None
@@ -294,6 +507,8 @@ class CacheQueryResponse(BaseModel):
 
 
 class CacheStatsResponse(BaseModel):
+    model_config = ConfigDict(frozen=True)
+    
     name: str
     ttl: int
     distance_threshold: float
@@ -301,8 +516,15 @@ class CacheStatsResponse(BaseModel):
     status: str
 
 
+# Browsers and proxies may reuse stats responses briefly as well
+STATS_RESPONSE_HEADERS = {
+    "Cache-Control": "public, max-age=2, stale-while-revalidate=10",
+    "Vary": "Accept-Encoding",
+}
+
+
 @app.post("/api/cache/query", response_model=CacheQueryResponse, tags=["Semantic Cache"])
-async def query_with_cache(request: CacheQueryRequest):
+async def query_with_cache(request: CacheQueryRequest, cache: LLMSemanticCache = Depends(get_cache)):
     """
     Query with semantic caching.
     
@@ -310,44 +532,44 @@ async def query_with_cache(request: CacheQueryRequest):
     If found (cache hit), returns the cached response.
     If not found (cache miss), generates a mock response and caches it.
     """
-    cache = get_semantic_cache()
-    cache_result = cache.check(request.query)
+    # Mock response for demo, generated only on a cache miss
+    cache_result = await run_in_threadpool(
+        cache.check_or_store,
+        request.query,
+        lambda query: f"This is a mock LLM response for: {query}",
+    )
     
     if cache_result.hit:
-        return CacheQueryResponse(
-            hit=True,
-            query=request.query,
-            response=cache_result.response,
-            cached_prompt=cache_result.cached_prompt,
-            similarity=cache_result.similarity,
-            distance=cache_result.distance,
-            source="cache",
-        )
+        return ORJSONResponse({
+            "hit": True,
+            "query": request.query,
+            "response": cache_result.response,
+            "cached_prompt": cache_result.cached_prompt,
+            "similarity": cache_result.similarity,
+            "distance": cache_result.distance,
+            "source": "cache",
+        })
     else:
-        # Mock response for demo
-        mock_response = f"This is a mock LLM response for: {request.query}"
-        cache.store(request.query, mock_response)
-        return CacheQueryResponse(
-            hit=False,
-            query=request.query,
-            response=mock_response,
-            cached_prompt=None,
-            similarity=None,
-            distance=None,
-            source="llm",
-        )
+        return ORJSONResponse({
+            "hit": False,
+            "query": request.query,
+            "response": cache_result.response,
+            "cached_prompt": None,
+            "similarity": None,
+            "distance": None,
+            "source": "llm",
+        })
 
 
 @app.post("/api/cache/store", tags=["Semantic Cache"])
-async def store_in_cache(request: CacheStoreRequest):
+async def store_in_cache(request: CacheStoreRequest, cache: LLMSemanticCache = Depends(get_cache)):
     """
     Store a query-response pair in the semantic cache.
     
     Use this to pre-populate the cache with known Q&A pairs.
     The query will be embedded and stored for semantic matching.
     """
-    cache = get_semantic_cache()
-    success = cache.store(request.query, request.response)
+    success = await run_in_threadpool(cache.store, request.query, request.response)
     
     if success:
         return {"status": "success", "message": "Response cached successfully"}
@@ -356,32 +578,31 @@ async def store_in_cache(request: CacheStoreRequest):
 
 
 @app.get("/api/cache/stats", response_model=CacheStatsResponse, tags=["Semantic Cache"])
-async def get_cache_stats():
+async def get_cache_stats(cache: LLMSemanticCache = Depends(get_cache)):
     """
     Get semantic cache statistics.
     
     Returns information about the cache including number of entries,
     TTL settings, and distance threshold.
     """
-    cache = get_semantic_cache()
-    stats = cache.get_stats()
+    # The cache reuses its FT.INFO result for a few seconds
+    stats = await run_in_threadpool(cache.get_stats)
     
-    return CacheStatsResponse(
-        name=stats.get("name", "unknown"),
-        ttl=stats.get("ttl", 0),
-        distance_threshold=stats.get("distance_threshold", 0),
-        num_entries=stats.get("num_entries", 0),
-        status=stats.get("status", "unknown"),
-    )
+    return ORJSONResponse({
+        "name": stats.get("name", "unknown"),
+        "ttl": stats.get("ttl", 0),
+        "distance_threshold": stats.get("distance_threshold", 0),
+        "num_entries": stats.get("num_entries", 0),
+        "status": stats.get("status", "unknown"),
+    }, headers=STATS_RESPONSE_HEADERS)
 
 
 @app.post("/api/cache/clear", tags=["Semantic Cache"])
-async def clear_cache():
+async def clear_cache(cache: LLMSemanticCache = Depends(get_cache)):
     """
     Clear all entries from the semantic cache.
     """
-    cache = get_semantic_cache()
-    success = cache.clear()
+    success = await run_in_threadpool(cache.clear)
     
     if success:
         return {"status": "success", "message": "Semantic cache cleared"}
@@ -394,11 +615,15 @@ async def clear_cache():
 # ============================================================================
 
 class HelpChatRequest(BaseModel):
+    model_config = ConfigDict(frozen=True)
+    
     message: str = Field(..., description="User's question or message")
     use_cache: bool = Field(True, description="Whether to use semantic cache")
 
 
 class HelpArticleResponse(BaseModel):
+    model_config = ConfigDict(frozen=True)
+    
     id: str
     title: str
     category: str
@@ -407,12 +632,16 @@ class HelpArticleResponse(BaseModel):
 
 
 class TokenUsageResponse(BaseModel):
+    model_config = ConfigDict(frozen=True)
+    
     prompt_tokens: int = 0
     completion_tokens: int = 0
     total_tokens: int = 0
 
 
 class HelpChatResponse(BaseModel):
+    model_config = ConfigDict(frozen=True)
+    
     answer: str
     sources: List[HelpArticleResponse]
     from_cache: bool
@@ -423,14 +652,30 @@ class HelpChatResponse(BaseModel):
 
 
 class HelpStatsResponse(BaseModel):
+    model_config = ConfigDict(frozen=True)
+    
     index_name: str
     num_articles: int
     index_status: str
     cache_stats: Dict[str, Any]
 
 
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+
+
+def _msgpack_default(obj: Any) -> Any:
+    """Encode the help engine's dataclasses for msgpack (orjson handles them natively)"""
+    if is_dataclass(obj):
+        return asdict(obj)
+    raise TypeError(f"Cannot serialize {type(obj).__name__} to msgpack")
+
+
 @app.post("/api/help/chat", response_model=HelpChatResponse, tags=["Help Center"])
-async def help_chat(request: HelpChatRequest):
+async def help_chat(
+    request: HelpChatRequest,
+    http_request: Request,
+    engine: HelpCenterEngine = Depends(get_help),
+):
     """
     Chat with the Help Center bot.
     
@@ -441,57 +686,64 @@ async def help_chat(request: HelpChatRequest):
     - "Why can't I watch this movie?"
     - "How do I change my plan?"
     - "Why is playback blurry?"
+    
+    Clients sending "Accept: application/msgpack" get the same payload
+    encoded as MessagePack.
     """
-    start_time = time.time()
+    start_ns = time.perf_counter_ns()
     
-    engine = get_help_engine()
-    result = engine.chat(request.message, use_cache=request.use_cache)
+    result = await engine.achat(request.message, use_cache=request.use_cache)
     
     # Calculate response time
-    response_time_ms = int((time.time() - start_time) * 1000)
-    
-    # Convert HelpArticle to response format
-    sources = [
-        HelpArticleResponse(
-            id=article.id,
-            title=article.title,
-            category=article.category,
-            content=article.content,
-            similarity=article.similarity,
-        )
-        for article in result.sources
-    ]
+    response_time_ms = (time.perf_counter_ns() - start_ns) // 1_000_000
+    
+    # HelpArticle/TokenUsage dataclasses have the same fields as their
+    # response models; orjson serializes dataclasses natively, so they're
+    # passed through as-is instead of being converted to dicts first
+    payload = {
+        "answer": result.answer,
+        "sources": result.sources,
+        "from_cache": result.from_cache,
+        "cache_similarity": result.cache_similarity,
+        "response_time_ms": response_time_ms,
+        "token_usage": result.token_usage,
+        "blocked": result.blocked,
+    }
     
-    # Convert token usage if present
-    token_usage = None
-    if result.token_usage:
-        token_usage = TokenUsageResponse(
-            prompt_tokens=result.token_usage.prompt_tokens,
-            completion_tokens=result.token_usage.completion_tokens,
-            total_tokens=result.token_usage.total_tokens,
+    if MSGPACK_MEDIA_TYPE in http_request.headers.get("accept", ""):
+        return Response(
+            content=msgpack.packb(payload, default=_msgpack_default, use_bin_type=True),
+            media_type=MSGPACK_MEDIA_TYPE,
+            headers={"Vary": "Accept"},
         )
+    return ORJSONResponse(payload, headers={"Vary": "Accept"})
+
+
+@app.post("/api/help/chat/stream", tags=["Help Center"])
+async def help_chat_stream(request: HelpChatRequest, engine: HelpCenterEngine = Depends(get_help)):
+    """
+    Chat with the Help Center bot, streaming the answer as plain text.
     
-    return HelpChatResponse(
-        answer=result.answer,
-        sources=sources,
-        from_cache=result.from_cache,
-        cache_similarity=result.cache_similarity,
-        response_time_ms=response_time_ms,
-        token_usage=token_usage,
-        blocked=result.blocked,
+    Same pipeline as /api/help/chat, but the answer is sent as the LLM
+    generates it instead of after the full response is ready.
+    Sources and token usage are not included in the stream.
+    """
+    return StreamingResponse(
+        engine.chat_stream(request.message, use_cache=request.use_cache),
+        media_type="text/plain",
+        headers={"X-Accel-Buffering": "no"},  # Don't let NGINX buffer the stream
     )
 
 
 @app.post("/api/help/ingest", tags=["Help Center"])
-async def ingest_help_articles():
+async def ingest_help_articles(engine: HelpCenterEngine = Depends(get_help)):
     """
     Ingest help articles from resources/help_articles.json.
     
     Creates vector embeddings and search index for all articles.
     Run this once to set up the Help Center.
     """
-    engine = get_help_engine()
-    result = engine.ingest_articles()
+    result = await run_in_threadpool(engine.ingest_articles)
     
     if result.get("status") == "success":
         return result
@@ -500,24 +752,40 @@ async def ingest_help_articles():
 
 
 @app.get("/api/help/stats", response_model=HelpStatsResponse, tags=["Help Center"])
-async def help_stats():
+async def help_stats(
+    engine: HelpCenterEngine = Depends(get_help),
+    cache: LLMSemanticCache = Depends(get_cache),
+):
     """
     Get Help Center statistics.
     
     Returns information about the help articles index and semantic cache.
     """
-    engine = get_help_engine()
-    cache = get_semantic_cache()
-    
-    index_stats = engine.get_stats()
-    cache_stats = cache.get_stats()
-    
-    return HelpStatsResponse(
-        index_name=index_stats.get("index_name", "unknown"),
-        num_articles=index_stats.get("num_articles", 0),
-        index_status=index_stats.get("index_status", "unknown"),
-        cache_stats=cache_stats,
-    )
+    # Both keep their own short-lived stats cache
+    index_stats = await run_in_threadpool(engine.get_stats)
+    cache_stats = await run_in_threadpool(cache.get_stats)
+    
+    return ORJSONResponse({
+        "index_name": index_stats.get("index_name", "unknown"),
+        "num_articles": index_stats.get("num_articles", 0),
+        "index_status": index_stats.get("index_status", "unknown"),
+        "cache_stats": cache_stats,
+    }, headers=STATS_RESPONSE_HEADERS)
+
+
+# Suggestions never change, so the JSON body is encoded once at import
+_SUGGESTIONS_JSON = orjson.dumps({
+    "suggestions": [
+        "Why can't I watch this movie?",
+        "How do I change my plan?",
+        "Why is playback blurry?",
+        "I forgot my password",
+        "How to download for offline viewing?",
+        "Video keeps buffering",
+        "How to set up parental controls?",
+        "Payment was declined",
+    ]
+})
 
 
 @app.get("/api/help/suggestions", tags=["Help Center"])
@@ -527,21 +795,22 @@ async def get_suggestions():
     
     Returns a list of common questions users can click to try.
     """
-    return {
-        "suggestions": [
-            "Why can't I watch this movie?",
-            "How do I change my plan?",
-            "Why is playback blurry?",
-            "I forgot my password",
-            "How to download for offline viewing?",
-            "Video keeps buffering",
-            "How to set up parental controls?",
-            "Payment was declined",
-        ]
-    }
+    return Response(content=_SUGGESTIONS_JSON, media_type="application/json")
 
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # Each worker is a separate process with its own engines, model and Redis
+    # pool, all created by every worker's lifespan startup, so memory grows
+    # with the worker count - WEB_CONCURRENCY caps it. Startup steps that
+    # rebuild shared Redis state (help index ingest, guardrail router) hold
+    # a Redis lock so concurrently starting workers don't race each other
+    uvicorn.run(
+        "backend.main:app",
+        host="0.0.0.0",
+        port=8000,
+        loop="uvloop",
+        http="httptools",
+        workers=int(os.getenv("WEB_CONCURRENCY", min(os.cpu_count() or 1, 4))),
+    )
 
@@ -3,29 +3,42 @@ Search Engine for Redis RAG Demo
 Implements various search methods using redisvl
 """
 import os
+import copy
+import functools
 import logging
 import warnings
-from typing import List, Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain, islice
+from typing import List, Dict, Any, Optional, Tuple, Iterator
 
+import numpy as np
 import pandas as pd
 from redis import Redis
+from redis.exceptions import ResponseError
 from redisvl.schema import IndexSchema
 from redisvl.index import SearchIndex
 from redisvl.query import VectorQuery, RangeQuery, TextQuery
 from redisvl.query.aggregate import AggregateHybridQuery
 from redisvl.query.filter import Tag, Num
-from redisvl.utils.vectorize import HFTextVectorizer
-from redisvl.extensions.cache.embeddings import EmbeddingsCache
 
 from .config import (
     REDIS_URL,
     INDEX_NAME,
     INDEX_SCHEMA,
-    EMBEDDING_MODEL,
     DEFAULT_NUM_RESULTS,
     DEFAULT_DISTANCE_THRESHOLD,
     DEFAULT_HYBRID_ALPHA,
+    DEFAULT_RRF_K,
+    RRF_CANDIDATE_FACTOR,
+    HYBRID_PREFILTER_CANDIDATES,
+    MOVIE_VECTOR_DTYPE,
+    MOVIE_HNSW_MIN_DOCS,
+    MOVIE_HNSW_M,
+    MOVIE_HNSW_EF_CONSTRUCTION,
+    MOVIE_MIN_EF_RUNTIME,
 )
+from .embeddings import get_vectorizer, embed_bulk, embed_query
+from .utils import unlink_keys, vector_field_attrs, TTLCache
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -34,6 +47,134 @@ logger = logging.getLogger(__name__)
 warnings.filterwarnings('ignore')
 os.environ["TOKENIZERS_PARALLELISM"] = "false"
 
+PIPELINE_BATCH_SIZE = 500  # Commands per pipeline round-trip when reading/writing movie keys
+# Fields every movie query returns. Shared by all query builders; queries
+# are still built per call, since one shared query object mutated per
+# request would race between threadpool workers
+MOVIE_RETURN_FIELDS = ["title", "genre", "rating", "description"]
+SCAN_BATCH_SIZE = 1000  # SCAN COUNT hint per server-side scan step
+INDEX_INFO_CACHE_TTL = 3.0  # Seconds to reuse get_index_info() results
+
+# One SCAN step plus HGETALL of every hash it returned, in a single round-trip.
+# Returns {next_cursor, {key1, fields1, key2, fields2, ...}}.
+SCAN_HGETALL_SCRIPT = """
+local reply = redis.call('SCAN', ARGV[1], 'MATCH', ARGV[2], 'COUNT', ARGV[3])
+local out = {}
+for _, key in ipairs(reply[2]) do
+    if redis.call('TYPE', key).ok == 'hash' then
+        out[#out + 1] = key
+        out[#out + 1] = redis.call('HGETALL', key)
+    end
+end
+return {reply[1], out}
+"""
+
+
+def _rrf_fuse(
+    rankings: List[List[str]],
+    num_results: int,
+    k: int = DEFAULT_RRF_K
+) -> List[Tuple[str, float]]:
+    """
+    Reciprocal Rank Fusion of several ranked ID lists.
+    
+    Args:
+        rankings: Document IDs per ranking, best first
+        num_results: Number of fused results to return
+        k: RRF smoothing constant
+    
+    Returns:
+        (doc_id, rrf_score) pairs, best first
+    """
+    doc_ids = list(dict.fromkeys(chain.from_iterable(rankings)))
+    if not doc_ids:
+        return []
+    
+    # ranks[i, j] = 0-based rank of doc j in ranking i, inf where it's absent
+    position = {doc_id: j for j, doc_id in enumerate(doc_ids)}
+    ranks = np.full((len(rankings), len(doc_ids)), np.inf)
+    for i, ranking in enumerate(rankings):
+        ranks[i, [position[doc_id] for doc_id in ranking]] = np.arange(len(ranking))
+    
+    # 1 / (k + 1-based rank), and 1 / inf = 0 for docs missing from a ranking
+    scores = np.reciprocal(k + 1 + ranks).sum(axis=0)
+    
+    top = min(num_results, len(doc_ids))
+    best = np.argpartition(-scores, top - 1)[:top]
+    best = best[np.argsort(-scores[best], kind="stable")]
+    return [(doc_ids[j], float(scores[j])) for j in best]
+
+
+def _encode_movie_vectors(vectors) -> np.ndarray:
+    """
+    Convert float embeddings (single vector or (N, dims) batch) to MOVIE_VECTOR_DTYPE.
+    
+    int8 scales each vector by its own max component onto [-127, 127];
+    the index uses cosine distance, which ignores per-vector scale.
+    """
+    vecs = np.asarray(vectors, dtype=np.float32)
+    if MOVIE_VECTOR_DTYPE != "int8":
+        return vecs.astype(MOVIE_VECTOR_DTYPE)
+    
+    max_abs = np.abs(vecs).max(axis=-1, keepdims=True)
+    scale = 127.0 / np.maximum(max_abs, 1e-6)
+    return np.clip(np.round(vecs * scale), -127, 127).astype(np.int8)
+
+
+def _movie_index_schema(num_movies: int) -> Dict[str, Any]:
+    """
+    Get the movie index schema for a corpus of the given size.
+    
+    Uses INDEX_SCHEMA as configured for small corpora and switches the
+    vector field to HNSW from MOVIE_HNSW_MIN_DOCS movies up.
+    """
+    if num_movies < MOVIE_HNSW_MIN_DOCS:
+        return INDEX_SCHEMA
+    
+    schema = copy.deepcopy(INDEX_SCHEMA)
+    vector_attrs = next(f for f in schema["fields"] if f["type"] == "vector")["attrs"]
+    vector_attrs.update({
+        "algorithm": "hnsw",
+        "m": MOVIE_HNSW_M,
+        "ef_construction": MOVIE_HNSW_EF_CONSTRUCTION,
+        "initial_cap": num_movies,
+    })
+    return schema
+
+
+@functools.lru_cache(maxsize=128)
+def _movie_filter(genre: Optional[str], min_rating: Optional[int]):
+    """
+    Build the genre/rating filter expression for filtered_search.
+    
+    The UI offers a fixed set of genres and ratings, so the same few
+    expressions are reused rather than rebuilt on every request. Callers
+    pass genre already lowercased so case variants share one entry.
+    """
+    filter_expression = None
+    
+    if genre and genre != "all":
+        filter_expression = Tag("genre") == genre
+    
+    if min_rating is not None and min_rating > 0:
+        num_filter = Num("rating") >= min_rating
+        if filter_expression:
+            filter_expression = filter_expression & num_filter
+        else:
+            filter_expression = num_filter
+    
+    return filter_expression
+
+
+def _movie_fields(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Display fields shared by every search type"""
+    return {
+        "title": result.get("title", "Unknown"),
+        "genre": result.get("genre", "Unknown"),
+        "rating": result.get("rating", "N/A"),
+        "description": result.get("description", ""),
+    }
+
 
 class MovieSearchEngine:
     """Search engine for movie recommendations using Redis Vector Search"""
@@ -42,21 +183,35 @@ class MovieSearchEngine:
         """Initialize the search engine with Redis connection and embeddings"""
         logger.info(f"Initializing MovieSearchEngine with Redis URL: {REDIS_URL}")
         self.client = Redis.from_url(REDIS_URL)
-        self.schema = IndexSchema.from_dict(INDEX_SCHEMA)
-        self.index = SearchIndex(self.schema, self.client)
+        # Only used to create the index; queries read the live index's layout
+        self._set_schema(num_movies=0)
+        self._scan_hgetall = self.client.register_script(SCAN_HGETALL_SCRIPT)
         
-        # Initialize the HuggingFace text vectorizer with embedding cache
-        logger.info(f"Loading embedding model: {EMBEDDING_MODEL}")
-        self.vectorizer = HFTextVectorizer(
-            model=EMBEDDING_MODEL,
-            cache=EmbeddingsCache(
-                name="embedcache",
-                ttl=600,
-                redis_client=self.client,
-            )
-        )
+        # Last get_index_info() result
+        self._info_cache = TTLCache(INDEX_INFO_CACHE_TTL)
+        
+        # Shared vectorizer (same model instance and embeddings cache as the
+        # help center and semantic cache)
+        self.vectorizer = get_vectorizer()
         logger.info("MovieSearchEngine initialized successfully")
     
+    def _set_schema(self, num_movies: int) -> None:
+        """Point the engine at the movie index schema sized for num_movies"""
+        self.schema = IndexSchema.from_dict(_movie_index_schema(num_movies))
+        self.index = SearchIndex(self.schema, self.client)
+    
+    def _ef_runtime(self, num_results: int, ef_runtime: Optional[int] = None) -> Optional[int]:
+        """
+        HNSW query-time candidate list size, or None for a FLAT index (which rejects it).
+        
+        The algorithm is read from the live index (via the short-lived
+        get_index_info() cache) rather than remembered per process, since
+        another worker may have rebuilt the index with the other layout.
+        """
+        if self.get_index_info().get("algorithm") != "hnsw":
+            return None
+        return ef_runtime or max(num_results * 4, MOVIE_MIN_EF_RUNTIME)
+    
     def check_connection(self) -> bool:
         """Check if Redis connection is working"""
         try:
@@ -75,29 +230,44 @@ class MovieSearchEngine:
             return False
     
     def get_index_info(self) -> Dict[str, Any]:
-        """Get information about the index"""
+        """Get information about the index (cached for INDEX_INFO_CACHE_TTL seconds)"""
+        return self._info_cache.get(self._fetch_index_info)
+    
+    def _fetch_index_info(self) -> Dict[str, Any]:
+        """Read index information from Redis (FT.INFO)"""
         try:
             info = self.index.info()
             return {
                 "name": info.get("index_name", INDEX_NAME),
                 "num_docs": info.get("num_docs", 0),
-                "indexing": info.get("indexing", 0)
+                "indexing": info.get("indexing", 0),
+                "algorithm": vector_field_attrs(info).get("algorithm"),
             }
         except Exception as e:
             return {"error": str(e)}
     
-    def _embed_query(self, query: str) -> List[float]:
-        """Generate embedding for a query string"""
-        return self.vectorizer.embed(query)
+    def _embed_descriptions(self, descriptions: List[str]) -> List[bytes]:
+        """Embed movie descriptions for indexing, as MOVIE_VECTOR_DTYPE byte buffers"""
+        return [row.tobytes() for row in _encode_movie_vectors(embed_bulk(descriptions))]
+    
+    def _embed_query(self, query: str) -> bytes:
+        """
+        Generate embedding for a query string, encoded like the indexed vectors.
+        
+        The float embedding is served from the in-process LRU when repeated.
+        """
+        return _encode_movie_vectors(embed_query(query)).tobytes()
     
     def vector_search(
         self,
         query: str,
-        num_results: int = DEFAULT_NUM_RESULTS
+        num_results: int = DEFAULT_NUM_RESULTS,
+        ef_runtime: Optional[int] = None
     ) -> List[Dict[str, Any]]:
         """
         Standard KNN vector search
         Returns movies most semantically similar to the query
+        ef_runtime overrides the HNSW candidate list size (ignored for FLAT)
         """
         logger.info(f"Vector search: query='{query}', num_results={num_results}")
         embedded_query = self._embed_query(query)
@@ -114,9 +284,11 @@ class MovieSearchEngine:
         # - return_score: If True, includes similarity score in results
         vec_query = VectorQuery(
           vector = embedded_query,
+          dtype = MOVIE_VECTOR_DTYPE,
+          ef_runtime = self._ef_runtime(DEFAULT_NUM_RESULTS, ef_runtime),
           vector_field_name = "vector",
           num_results = DEFAULT_NUM_RESULTS,
-          return_fields = ["title","genre","rating","description"]
+          return_fields = MOVIE_RETURN_FIELDS
         )
         
         results = self.index.query(vec_query)
@@ -128,37 +300,29 @@ class MovieSearchEngine:
         query: str,
         genre: Optional[str] = None,
         min_rating: Optional[int] = None,
-        num_results: int = DEFAULT_NUM_RESULTS
+        num_results: int = DEFAULT_NUM_RESULTS,
+        ef_runtime: Optional[int] = None
     ) -> List[Dict[str, Any]]:
         """
         Vector search with tag and numeric filters
         Filters results by genre and/or minimum rating
+        ef_runtime overrides the HNSW candidate list size (ignored for FLAT)
         """
         logger.info(f"Filtered search: query='{query}', genre={genre}, min_rating={min_rating}, num_results={num_results}")
         embedded_query = self._embed_query(query)
         
-        # Build filter expression
-        filter_expression = None
-        
-        if genre and genre.lower() != "all":
-            filter_expression = Tag("genre") == genre.lower()
-            logger.debug(f"Added genre filter: {genre}")
-        
-        if min_rating is not None and min_rating > 0:
-            num_filter = Num("rating") >= min_rating
-            if filter_expression:
-                filter_expression = filter_expression & num_filter
-            else:
-                filter_expression = num_filter
-            logger.debug(f"Added rating filter: >= {min_rating}")
+        filter_expression = _movie_filter(genre.lower() if genre else None, min_rating)
+        logger.debug(f"Filter expression: {filter_expression}")
         
         vec_query = VectorQuery(
             vector=embedded_query,
+            dtype=MOVIE_VECTOR_DTYPE,
             vector_field_name="vector",
             num_results=num_results,
-            return_fields=["title", "genre", "rating", "description"],
+            return_fields=MOVIE_RETURN_FIELDS,
             return_score=True,
             filter_expression=filter_expression,
+            ef_runtime=self._ef_runtime(num_results, ef_runtime),
         )
         
         results = self.index.query(vec_query)
@@ -187,7 +351,7 @@ class MovieSearchEngine:
             text = query,
             text_field_name = "description",
             num_results = DEFAULT_NUM_RESULTS,
-            return_fields = ["title","genre","rating","description"]
+            return_fields = MOVIE_RETURN_FIELDS
         )
         
         results = self.index.query(text_query)
@@ -198,14 +362,23 @@ class MovieSearchEngine:
         self,
         query: str,
         alpha: float = DEFAULT_HYBRID_ALPHA,
-        num_results: int = DEFAULT_NUM_RESULTS
+        num_results: int = DEFAULT_NUM_RESULTS,
+        fusion: str = "weighted",
+        rrf_k: int = DEFAULT_RRF_K
     ) -> List[Dict[str, Any]]:
         """
         Hybrid search combining vector and text search
         Alpha controls the weight: higher = more vector, lower = more text
+        With fusion="rrf", rankings are merged by Reciprocal Rank Fusion instead
+        With fusion="prefilter", only keyword matches are vector-ranked (two-stage)
         """
-        logger.info(f"Hybrid search: query='{query}', alpha={alpha}, num_results={num_results}")
+        logger.info(f"Hybrid search: query='{query}', alpha={alpha}, num_results={num_results}, fusion={fusion}")
         embedded_query = self._embed_query(query)
+        
+        if fusion == "rrf":
+            return self._rrf_hybrid_search(query, embedded_query, num_results, rrf_k)
+        if fusion == "prefilter":
+            return self._prefilter_hybrid_search(query, embedded_query, alpha, num_results)
 
         # TODO
         # Challenge: Create a AggregateHybridQuery object
@@ -217,16 +390,127 @@ class MovieSearchEngine:
             text_field_name="description",
             text_scorer="BM25",
             vector=embedded_query,
+            dtype=MOVIE_VECTOR_DTYPE,
             vector_field_name="vector",
             alpha=alpha,
             num_results=num_results,
-            return_fields=["title", "genre", "rating", "description"],
+            return_fields=MOVIE_RETURN_FIELDS,
         )
         
         results = self.index.query(hybrid_query)
         logger.info(f"Hybrid search returned {len(results)} results")
         return self._format_results(results, "hybrid")
     
+    def _prefilter_hybrid_search(
+        self,
+        query: str,
+        embedded_query: bytes,
+        alpha: float,
+        num_results: int
+    ) -> List[Dict[str, Any]]:
+        """
+        Two-stage hybrid search: BM25 match as a pre-filter, then vector ranking.
+        
+        The KNN query is restricted to documents matching the keyword query,
+        so Redis only computes vector distances for lexical candidates.
+        Scores are fused as alpha * vector_similarity + (1 - alpha) * BM25,
+        with BM25 normalized by the best candidate's score.
+        """
+        text_query = TextQuery(
+            text=query,
+            text_field_name="description",
+            text_scorer="BM25STD",
+            num_results=HYBRID_PREFILTER_CANDIDATES,
+            return_fields=MOVIE_RETURN_FIELDS,
+        )
+        vec_query = VectorQuery(
+            vector=embedded_query,
+            dtype=MOVIE_VECTOR_DTYPE,
+            vector_field_name="vector",
+            num_results=HYBRID_PREFILTER_CANDIDATES,
+            return_fields=MOVIE_RETURN_FIELDS,
+            return_score=True,
+            filter_expression=f"({text_query.query_string()})",
+            ef_runtime=self._ef_runtime(HYBRID_PREFILTER_CANDIDATES),
+        )
+        
+        # Both stages in one round-trip
+        text_results, vec_results = self.index.batch_query([text_query, vec_query])
+        if not vec_results:
+            return []
+        
+        text_scores = {doc["id"]: float(doc.get("score", 0)) for doc in text_results}
+        max_text_score = max(text_scores.values(), default=0.0) or 1.0
+        
+        vector_sims = 1 - np.array([float(doc["vector_distance"]) for doc in vec_results])
+        norm_text = np.array([text_scores.get(doc["id"], 0.0) for doc in vec_results]) / max_text_score
+        hybrid_scores = alpha * vector_sims + (1 - alpha) * norm_text
+        
+        results = []
+        for i in np.argsort(-hybrid_scores, kind="stable")[:num_results]:
+            doc = vec_results[i]
+            results.append({
+                **doc,
+                "hybrid_score": float(hybrid_scores[i]),
+                "vector_similarity": float(vector_sims[i]),
+                "text_score": text_scores.get(doc["id"], 0),
+            })
+        
+        logger.info(f"Prefilter hybrid search returned {len(results)} results")
+        return self._format_results(results, "hybrid")
+    
+    def _rrf_hybrid_search(
+        self,
+        query: str,
+        embedded_query: bytes,
+        num_results: int,
+        rrf_k: int
+    ) -> List[Dict[str, Any]]:
+        """Fuse separate KNN and BM25 rankings with Reciprocal Rank Fusion"""
+        num_candidates = num_results * RRF_CANDIDATE_FACTOR
+        vec_query = VectorQuery(
+            vector=embedded_query,
+            dtype=MOVIE_VECTOR_DTYPE,
+            vector_field_name="vector",
+            num_results=num_candidates,
+            return_fields=MOVIE_RETURN_FIELDS,
+            return_score=True,
+            ef_runtime=self._ef_runtime(num_candidates),
+        )
+        text_query = TextQuery(
+            text=query,
+            text_field_name="description",
+            text_scorer="BM25STD",
+            num_results=num_candidates,
+            return_fields=MOVIE_RETURN_FIELDS,
+        )
+        
+        # Both rankings in one round-trip
+        vec_results, text_results = self.index.batch_query([vec_query, text_query])
+        
+        docs = {doc["id"]: doc for doc in chain(text_results, vec_results)}
+        fused = _rrf_fuse(
+            [[doc["id"] for doc in vec_results], [doc["id"] for doc in text_results]],
+            num_results,
+            rrf_k,
+        )
+        
+        text_scores = {doc["id"]: doc.get("score", 0) for doc in text_results}
+        vec_distances = {doc["id"]: doc.get("vector_distance") for doc in vec_results}
+        
+        results = []
+        for doc_id, rrf_score in fused:
+            distance = vec_distances.get(doc_id)
+            results.append({
+                **docs[doc_id],
+                "hybrid_score": rrf_score,
+                "vector_similarity": 1 - float(distance) if distance is not None else 0,
+                "text_score": text_scores.get(doc_id, 0),
+            })
+        
+        logger.info(f"RRF hybrid search returned {len(results)} results")
+        return self._format_results(results, "hybrid")
+    
     def range_search(
         self,
         query: str,
@@ -245,8 +529,9 @@ class MovieSearchEngine:
         
         range_query = RangeQuery(
             vector=embedded_query,
+            dtype=MOVIE_VECTOR_DTYPE,
             vector_field_name="vector",
-            return_fields=["title", "genre", "rating", "description"],
+            return_fields=MOVIE_RETURN_FIELDS,
             return_score=True,
             distance_threshold=distance_threshold,
         )
@@ -261,37 +546,60 @@ class MovieSearchEngine:
         search_type: str
     ) -> List[Dict[str, Any]]:
         """Format search results for display"""
-        formatted = []
+        # Pick the score formatter once per call rather than per row
+        formatter = self._RESULT_FORMATTERS.get(search_type)
+        if formatter is None:
+            return [_movie_fields(result) for result in results]
+        return formatter(self, results)
+    
+    def _format_vector_results(self, results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Add distance and similarity, computed for all rows in one NumPy pass"""
+        distances = np.array(
+            [result.get("vector_distance") for result in results], dtype=np.float64
+        )  # None -> nan
+        similarities = 1.0 - distances
         
+        formatted = []
+        for result, distance, similarity in zip(results, distances.tolist(), similarities.tolist()):
+            formatted_result = _movie_fields(result)
+            if distance == distance:  # Not nan; a perfect match (0.0) still counts
+                formatted_result["distance"] = distance
+                formatted_result["similarity"] = similarity
+            formatted.append(formatted_result)
+        return formatted
+    
+    def _format_keyword_results(self, results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Add the BM25 score where present"""
+        formatted = []
         for result in results:
-            formatted_result = {
-                "title": result.get("title", "Unknown"),
-                "genre": result.get("genre", "Unknown"),
-                "rating": result.get("rating", "N/A"),
-                "description": result.get("description", ""),
-            }
-            
-            # Add score/distance based on search type
-            if search_type in ["vector", "filtered", "range"]:
-                distance = result.get("vector_distance", None)
-                if distance:
-                    formatted_result["distance"] = float(distance)
-                    formatted_result["similarity"] = 1 - float(distance)
-            
-            elif search_type == "keyword":
-                score = result.get("score", None)
-                if score:
-                    formatted_result["score"] = float(score)
-            
-            elif search_type == "hybrid":
-                formatted_result["hybrid_score"] = float(result.get("hybrid_score", 0))
-                formatted_result["vector_similarity"] = float(result.get("vector_similarity", 0))
-                formatted_result["text_score"] = float(result.get("text_score", 0))
-            
+            formatted_result = _movie_fields(result)
+            score = result.get("score")
+            if score is not None:
+                formatted_result["score"] = float(score)
             formatted.append(formatted_result)
-        
         return formatted
     
+    def _format_hybrid_results(self, results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Add the fused score and its vector/text components"""
+        return [
+            {
+                **_movie_fields(result),
+                "hybrid_score": float(result.get("hybrid_score", 0)),
+                "vector_similarity": float(result.get("vector_similarity", 0)),
+                "text_score": float(result.get("text_score", 0)),
+            }
+            for result in results
+        ]
+    
+    # search_type -> score formatter used by _format_results
+    _RESULT_FORMATTERS = {
+        "vector": _format_vector_results,
+        "filtered": _format_vector_results,
+        "range": _format_vector_results,
+        "keyword": _format_keyword_results,
+        "hybrid": _format_hybrid_results,
+    }
+    
     def clear_all_data(self) -> bool:
         """
         Clear all movie data and search index from Redis.
@@ -306,11 +614,9 @@ class MovieSearchEngine:
             
             # Delete all movie:* keys
             logger.info("Scanning for movie keys to delete...")
-            movie_keys = list(self.client.scan_iter(match="movie:*"))
-            
-            if movie_keys:
-                logger.info(f"Deleting {len(movie_keys)} movie keys...")
-                self.client.delete(*movie_keys)
+            num_deleted = unlink_keys(self.client, "movie:*", PIPELINE_BATCH_SIZE)
+            self._info_cache.clear()
+            logger.info(f"Deleted {num_deleted} movie keys")
             
             logger.info("All movie data cleared successfully")
             return True
@@ -319,6 +625,90 @@ class MovieSearchEngine:
             logger.error(f"Error clearing data: {e}")
             return False
 
+    def _hgetall_many(self, keys: List[Any]) -> List[Dict[bytes, bytes]]:
+        """HGETALL each key, pipelined PIPELINE_BATCH_SIZE keys per round-trip"""
+        results = []
+        for start in range(0, len(keys), PIPELINE_BATCH_SIZE):
+            pipe = self.client.pipeline(transaction=False)
+            for key in keys[start:start + PIPELINE_BATCH_SIZE]:
+                pipe.hgetall(key)
+            results.extend(pipe.execute())
+        return results
+    
+    def _scan_hashes(self, pattern: str) -> Iterator[Tuple[Any, Dict[bytes, bytes]]]:
+        """
+        Yield (key, fields) for every hash matching pattern.
+        
+        Each step runs SCAN and the HGETALLs server-side, so a step costs one
+        round-trip instead of a SCAN plus a read per key. Falls back to
+        client-side SCAN + pipelined HGETALL where scripts can't touch
+        undeclared keys (e.g. clustered deployments).
+        """
+        cursor = b"0"
+        scanned = False
+        try:
+            while True:
+                cursor, entries = self._scan_hgetall(args=[cursor, pattern, SCAN_BATCH_SIZE])
+                scanned = True
+                for key, fields in zip(entries[::2], entries[1::2]):
+                    yield key, dict(zip(fields[::2], fields[1::2]))
+                if cursor in (b"0", "0", 0):
+                    return
+        except ResponseError as e:
+            if scanned:
+                raise  # Failed mid-scan; restarting would yield duplicates
+            logger.warning(f"Server-side scan unavailable ({e}), falling back to SCAN + HGETALL")
+        
+        keys = self.client.scan_iter(match=pattern, count=SCAN_BATCH_SIZE)
+        while True:
+            batch = list(islice(keys, PIPELINE_BATCH_SIZE))
+            if not batch:
+                return
+            yield from zip(batch, self._hgetall_many(batch))
+    
+    def _movie_chunks(self) -> Iterator[List[Tuple[Any, Dict[bytes, bytes]]]]:
+        """Yield the movie:* hashes as lists of up to PIPELINE_BATCH_SIZE (key, fields) pairs"""
+        movie_hashes = self._scan_hashes("movie:*")
+        while True:
+            chunk = list(islice(movie_hashes, PIPELINE_BATCH_SIZE))
+            if not chunk:
+                return
+            yield chunk
+    
+    def _embed_movie_chunk(self, movie_hashes: List[Tuple[Any, Dict[bytes, bytes]]]) -> int:
+        """
+        Embed the descriptions of one chunk of movies and write their vectors back.
+        
+        Returns:
+            Number of movies embedded
+        """
+        keys = []
+        descriptions = []
+        
+        for key, movie_data in movie_hashes:
+            # Only the description is used, so only it is decoded. The other
+            # fields are never touched, including a binary vector left by a
+            # previous run, which isn't valid UTF-8
+            description = movie_data.get(b'description')
+            
+            # Skip if no description (required for embedding)
+            if description is None:
+                logger.warning(f"Skipping {key}: no description field")
+                continue
+            
+            keys.append(key)
+            descriptions.append(description.decode('utf-8'))
+        
+        if not descriptions:
+            return 0
+        
+        # One pipeline round-trip writes the whole chunk's vectors
+        pipe = self.client.pipeline(transaction=False)
+        for key, embedding in zip(keys, self._embed_descriptions(descriptions)):
+            pipe.hset(key, "vector", embedding)
+        pipe.execute()
+        return len(keys)
+    
     def create_embeddings_and_index(self) -> bool:
         """
         Create embeddings and search index from RIOT-imported data.
@@ -327,64 +717,50 @@ class MovieSearchEngine:
         vector embeddings for descriptions, updates keys with vectors,
         and creates the search index.
         
+        Movies are processed PIPELINE_BATCH_SIZE at a time: a worker thread
+        reads the next chunk from Redis while the current one is embedded,
+        and only those two chunks are held in memory.
+        
         Returns True if successful, False otherwise
         """
         try:
-            # Scan for all movie:* keys imported by RIOT
-            logger.info("Scanning for RIOT-imported movie keys...")
-            movie_keys = list(self.client.scan_iter(match="movie:*"))
+            # Scan for all movie:* keys imported by RIOT, reading each hash as we go
+            logger.info("Scanning for RIOT-imported movie keys and generating embeddings...")
+            num_found = 0
+            num_movies = 0
             
-            if not movie_keys:
+            chunks = self._movie_chunks()
+            with ThreadPoolExecutor(max_workers=1) as reader:
+                # The generator is only ever advanced by the single reader
+                # thread, one next() at a time
+                next_chunk = reader.submit(next, chunks, None)
+                while True:
+                    chunk = next_chunk.result()
+                    if chunk is None:
+                        break
+                    next_chunk = reader.submit(next, chunks, None)
+                    
+                    num_found += len(chunk)
+                    num_movies += self._embed_movie_chunk(chunk)
+                    logger.info(f"Embedded {num_movies} movies so far")
+            
+            if not num_found:
                 logger.error("No movie keys found. Please run RIOT import first.")
                 return False
             
-            logger.info(f"Found {len(movie_keys)} movie keys in Redis")
-            
-            # Read movie data from Redis
-            movies = []
-            descriptions = []
+            logger.info(f"Found {num_found} movie keys in Redis")
             
-            for key in movie_keys:
-                # Get all fields from the hash
-                movie_data = self.client.hgetall(key)
-                
-                # Decode bytes to strings
-                movie = {
-                    k.decode('utf-8') if isinstance(k, bytes) else k: 
-                    v.decode('utf-8') if isinstance(v, bytes) else v 
-                    for k, v in movie_data.items()
-                }
-                
-                # Skip if no description (required for embedding)
-                if 'description' not in movie:
-                    logger.warning(f"Skipping {key}: no description field")
-                    continue
-                
-                movie['_key'] = key.decode('utf-8') if isinstance(key, bytes) else key
-                movies.append(movie)
-                descriptions.append(movie['description'])
-            
-            if not movies:
+            if not num_movies:
                 logger.error("No valid movies found with description field")
                 return False
             
-            logger.info(f"Processing {len(movies)} movies with descriptions")
-            
-            # Generate embeddings for descriptions
-            logger.info("Generating embeddings for movie descriptions...")
-            embeddings = self.vectorizer.embed_many(descriptions, as_buffer=True)
-            
-            # Update each movie key with the vector embedding
-            logger.info("Updating movie keys with vector embeddings...")
-            for movie, embedding in zip(movies, embeddings):
-                key = movie['_key']
-                self.client.hset(key, "vector", embedding)
-            
-            # Create or overwrite the search index
-            logger.info(f"Creating Redis search index: {INDEX_NAME}")
+            # Create or overwrite the search index, HNSW or FLAT depending on corpus size
+            self._set_schema(num_movies=num_movies)
+            logger.info(f"Creating Redis search index: {INDEX_NAME} ({self.schema.fields['vector'].attrs.algorithm.upper()})")
             self.index.create(overwrite=True)
+            self._info_cache.clear()
             
-            logger.info(f"Successfully created embeddings and index for {len(movies)} movies")
+            logger.info(f"Successfully created embeddings and index for {num_movies} movies")
             return True
             
         except Exception as e:
@@ -12,23 +12,34 @@ Benefits:
 Reference: https://github.com/redis-developer/reduce-llm-calls-with-vector-search
 """
 import logging
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Callable
 from dataclasses import dataclass
 
 from redis import Redis
 from redisvl.extensions.llmcache import SemanticCache
-from redisvl.utils.vectorize import HFTextVectorizer
 
 from .config import (
     REDIS_URL,
-    EMBEDDING_MODEL,
     SEMANTIC_CACHE_NAME,
     SEMANTIC_CACHE_TTL,
     SEMANTIC_CACHE_DISTANCE_THRESHOLD,
+    CACHE_VECTOR_DTYPE,
 )
+from .embeddings import get_vectorizer, embed_query
+from .utils import TTLCache
 
 logger = logging.getLogger(__name__)
 
+# Types the vectorizer can write directly; int8 would need a scale step
+# SemanticCache doesn't apply, since embedding components are in [-1, 1]
+SUPPORTED_CACHE_DTYPES = ("float32", "float16")
+
+STATS_CACHE_TTL = 3.0  # Seconds to reuse get_stats() results
+
+# Fields check() reads from a hit; SemanticCache drops the rest (metadata,
+# timestamps, filters) from each hit dict
+CHECK_RETURN_FIELDS = ["prompt", "response", "vector_distance"]
+
 
 @dataclass
 class CacheResult:
@@ -85,13 +96,24 @@ class LLMSemanticCache:
         self.ttl = ttl
         self.distance_threshold = distance_threshold
         
+        # Last get_stats() result
+        self._stats_cache = TTLCache(STATS_CACHE_TTL)
+        
         logger.info(f"Initializing SemanticCache: name={name}, ttl={ttl}s, threshold={distance_threshold}")
         
         # Initialize Redis client
         self.client = Redis.from_url(REDIS_URL)
         
-        # Initialize vectorizer (same model as movie search for consistency)
-        self.vectorizer = HFTextVectorizer(model=EMBEDDING_MODEL)
+        # Shared vectorizer (same model instance as the help center)
+        if CACHE_VECTOR_DTYPE not in SUPPORTED_CACHE_DTYPES:
+            raise ValueError(
+                f"Unsupported CACHE_VECTOR_DTYPE {CACHE_VECTOR_DTYPE!r}, expected one of {SUPPORTED_CACHE_DTYPES}"
+            )
+        vectorizer = get_vectorizer()
+        if vectorizer.dtype != CACHE_VECTOR_DTYPE:
+            # Shallow copy shares the loaded model; only the stored byte format differs
+            vectorizer = vectorizer.model_copy(update={"dtype": CACHE_VECTOR_DTYPE})
+        self.vectorizer = vectorizer
         
         # Initialize the semantic cache from RedisVL
 
@@ -113,12 +135,13 @@ class LLMSemanticCache:
         
         logger.info("LLMSemanticCache initialized successfully")
     
-    def check(self, query: str) -> CacheResult:
+    def check(self, query: str, vector: Optional[List[float]] = None) -> CacheResult:
         """
         Check if a semantically similar query exists in cache.
         
         Args:
             query: The user's query to check
+            vector: Precomputed embedding of the query (skips re-embedding)
             
         Returns:
             CacheResult with hit=True if found, along with the cached response
@@ -130,7 +153,14 @@ class LLMSemanticCache:
             # Challenge: Check the cache for similar queries
             #
             # - prompt: The user's query (will be embedded)
-            results = self.cache.check()
+            # - vector: Precomputed query embedding, used instead of the prompt if given
+            # - num_results: Only the closest match is used
+            results = self.cache.check(
+                prompt=query,
+                vector=vector,
+                num_results=1,
+                return_fields=CHECK_RETURN_FIELDS,
+            )
             
             if results:
                 # Cache hit - return the cached response
@@ -153,13 +183,14 @@ class LLMSemanticCache:
             logger.error(f"Error checking cache: {e}")
             return CacheResult(hit=False, query=query)
     
-    def store(self, query: str, response: str) -> bool:
+    def store(self, query: str, response: str, vector: Optional[List[float]] = None) -> bool:
         """
         Store a query-response pair in the semantic cache.
         
         Args:
             query: The user's query (will be embedded)
             response: The LLM's response to cache
+            vector: Precomputed embedding of the query (skips re-embedding)
             
         Returns:
             True if stored successfully
@@ -171,9 +202,11 @@ class LLMSemanticCache:
             # - prompt: The user'0.
             # s query (will be embedded)
             # - response: The LLM's response to cache
+            # - vector: Precomputed query embedding, used instead of embedding the prompt if given
             self.cache.store(
             prompt=query,
-            response=response
+            response=response,
+            vector=vector
             )
             logger.info(f"Cached response for query: '{query[:50]}...'")
             return True
@@ -182,6 +215,31 @@ class LLMSemanticCache:
             logger.error(f"Error storing in cache: {e}")
             return False
     
+    def check_or_store(self, query: str, compute_response: Callable[[str], str]) -> CacheResult:
+        """
+        Return the cached response for a query, or compute and cache a new one.
+        
+        The query is embedded once and that vector is used for both the
+        lookup and the store, instead of each step embedding the prompt.
+        
+        Args:
+            query: The user's query
+            compute_response: Called with the query on a cache miss
+            
+        Returns:
+            CacheResult with hit=True for a cached response, otherwise
+            hit=False carrying the freshly computed response
+        """
+        vector = embed_query(query)
+        
+        result = self.check(query, vector=vector)
+        if result.hit:
+            return result
+        
+        response = compute_response(query)
+        self.store(query, response, vector=vector)
+        return CacheResult(hit=False, query=query, response=response)
+    
     def clear(self) -> bool:
         """
         Clear all entries from the semantic cache.
@@ -191,6 +249,7 @@ class LLMSemanticCache:
         """
         try:
             self.cache.clear()
+            self._stats_cache.clear()
             logger.info("Semantic cache cleared")
             return True
         except Exception as e:
@@ -199,11 +258,15 @@ class LLMSemanticCache:
     
     def get_stats(self) -> Dict[str, Any]:
         """
-        Get cache statistics.
+        Get cache statistics (cached for STATS_CACHE_TTL seconds).
         
         Returns:
             Dictionary with cache stats
         """
+        return self._stats_cache.get(self._fetch_stats)
+    
+    def _fetch_stats(self) -> Dict[str, Any]:
+        """Read cache statistics from Redis (FT.INFO on the cache index)"""
         try:
             # Get index info
             index = self.cache._index
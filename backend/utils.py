@@ -0,0 +1,125 @@
+"""
+Shared Redis Helpers
+====================
+Small helpers used by more than one engine.
+"""
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from redis import Redis
+
+
+def unlink_keys(client: Redis, pattern: str, batch_size: int) -> int:
+    """
+    Delete all keys matching pattern, streaming SCAN results in batches.
+    
+    UNLINK frees memory off Redis' main thread and each command carries at
+    most batch_size keys; only one batch of key names is held in Python at
+    a time.
+    
+    Returns:
+        Number of keys deleted
+    """
+    num_deleted = 0
+    batch = []
+    for key in client.scan_iter(match=pattern, count=batch_size):
+        batch.append(key)
+        if len(batch) >= batch_size:
+            num_deleted += client.unlink(*batch)
+            batch = []
+    if batch:
+        num_deleted += client.unlink(*batch)
+    return num_deleted
+
+
+# FT.INFO vector parameter names -> schema attr names compared on startup
+_VECTOR_INFO_ATTRS = {
+    "algorithm": "algorithm",
+    "data_type": "datatype",
+    "type": "datatype",  # Older servers' spelling, after the algorithm
+    "distance_metric": "distance_metric",
+}
+
+
+def vector_field_attrs(info: Dict[str, Any]) -> Dict[str, str]:
+    """
+    Get algorithm, datatype and distance_metric of the vector field in a live index.
+    
+    Takes the FT.INFO reply returned by SearchIndex.info(). Values are
+    lowercased like the schema dicts. Only parameters FT.INFO actually
+    reports are included: some servers omit some or all of them, and a
+    missing one means "unknown", not a default.
+    """
+    for attribute in info.get("attributes", []):
+        values = [v.decode("utf-8") if isinstance(v, bytes) else str(v) for v in attribute]
+        upper = [v.upper() for v in values]
+        if "VECTOR" not in upper:
+            continue
+        
+        attrs = {}
+        start = upper.index("VECTOR") + 1
+        if start < len(values) and upper[start] in ("FLAT", "HNSW"):
+            # Older format: algorithm value and a parameter count, then pairs
+            attrs["algorithm"] = values[start].lower()
+            start += 2
+        for key, value in zip(values[start::2], values[start + 1::2]):
+            name = _VECTOR_INFO_ATTRS.get(key.lower())
+            if name is not None:
+                attrs[name] = value.lower()
+        return attrs
+    return {}
+
+
+def mismatched_vector_attrs(info: Dict[str, Any], expected: Dict[str, Any]) -> Dict[str, str]:
+    """
+    Live vector field settings (from an FT.INFO reply) that differ from expected.
+    
+    Settings FT.INFO doesn't report are never counted as a mismatch.
+    """
+    return {
+        name: value
+        for name, value in vector_field_attrs(info).items()
+        if value != str(expected[name]).lower()
+    }
+
+
+class TTLCache:
+    """
+    One dict result, reused for ttl seconds after it was fetched.
+    
+    Concurrent misses wait on one lock, so only the first caller runs the
+    fetch. Results with an "error" key are returned but not cached, so a
+    transient failure isn't reported for the whole TTL.
+    """
+    
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._entry: Optional[Tuple[float, Dict[str, Any]]] = None  # (fetched_at, value)
+        self._lock = threading.Lock()
+    
+    def _fresh(self) -> Optional[Dict[str, Any]]:
+        entry = self._entry
+        if entry is not None and time.monotonic() - entry[0] < self.ttl:
+            return entry[1]
+        return None
+    
+    def get(self, fetch: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """Return the cached result, calling fetch() if it is missing or expired"""
+        value = self._fresh()
+        if value is not None:
+            return value
+        
+        with self._lock:
+            value = self._fresh()  # Another thread may have refreshed it
+            if value is not None:
+                return value
+            
+            value = fetch()
+            if "error" not in value:
+                self._entry = (time.monotonic(), value)
+            return value
+    
+    def clear(self) -> None:
+        """Drop the cached result, e.g. after the underlying data changed"""
+        self._entry = None
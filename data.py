@@ -3,19 +3,35 @@
 
 import redis
 
-r = redis.Redis(
-    host='xxxxx.ap-south-1-1.ec2.cloud.redislabs.com',
-    port=18804,
-    decode_responses=True,
-    username="default",
-    password="xxxxx",
-)
+_pool = None
 
-success = r.set('foo', 'bar')
-# True
 
-result = r.get('foo')
-print(result)
-# >>> bar
+def get_client():
+    """Get a client on the shared connection pool (created on first call)"""
+    global _pool
+    if _pool is None:
+        _pool = redis.ConnectionPool(
+            host='xxxxx.ap-south-1-1.ec2.cloud.redislabs.com',
+            port=18804,
+            decode_responses=True,
+            username="default",
+            password="xxxxx",
+            max_connections=32,
+        )
+    return redis.Redis(connection_pool=_pool)
 
 
+def smoke_test():
+    """SET then GET a key in one pipelined round-trip"""
+    pipe = get_client().pipeline(transaction=False)
+    pipe.set('foo', 'bar')
+    pipe.get('foo')
+    success, result = pipe.execute()
+    # True, 'bar'
+    return result
+
+
+if __name__ == '__main__':
+    result = smoke_test()
+    print(result)
+    # >>> bar
@@ -0,0 +1,101 @@
+"""
+Tests for the FT.INFO vector field parsing in backend/utils.py.
+
+Run from the repo root: python -m unittest discover tests
+"""
+import unittest
+
+from backend.help_center import _help_index_schema
+from backend.utils import mismatched_vector_attrs, vector_field_attrs
+
+
+def _ft_info(vector_attribute, num_docs=120):
+    """FT.INFO reply as SearchIndex.info() returns it, with the given vector attribute"""
+    return {
+        "index_name": "help_articles_idx",
+        "index_options": [],
+        "index_definition": ["key_type", "HASH", "prefixes", ["help:"], "default_score", "1"],
+        "attributes": [
+            ["identifier", "id", "attribute", "id", "type", "TAG", "SEPARATOR", ","],
+            ["identifier", "title", "attribute", "title", "type", "TEXT", "WEIGHT", "1"],
+            ["identifier", "category", "attribute", "category", "type", "TAG", "SEPARATOR", ","],
+            vector_attribute,
+        ],
+        "num_docs": str(num_docs),
+        "max_doc_id": str(num_docs),
+        "num_terms": "2471",
+        "num_records": "9320",
+        "indexing": "0",
+        "percent_indexed": "1",
+        "hash_indexing_failures": "0",
+    }
+
+
+class VectorFieldAttrsTest(unittest.TestCase):
+    def test_redis_7_flat_reply(self):
+        info = _ft_info([
+            "identifier", "embedding", "attribute", "embedding", "type", "VECTOR",
+            "algorithm", "FLAT", "data_type", "FLOAT16", "dim", 384,
+            "distance_metric", "IP",
+        ])
+        self.assertEqual(
+            vector_field_attrs(info),
+            {"algorithm": "flat", "datatype": "float16", "distance_metric": "ip"},
+        )
+        expected = _help_index_schema(120)["fields"][-1]["attrs"]
+        self.assertEqual(mismatched_vector_attrs(info, expected), {})
+
+    def test_hnsw_reply(self):
+        info = _ft_info([
+            "identifier", "embedding", "attribute", "embedding", "type", "VECTOR",
+            "algorithm", "HNSW", "data_type", "FLOAT16", "dim", 384,
+            "distance_metric", "IP", "M", 16, "ef_construction", 200,
+        ], num_docs=5000)
+        expected = _help_index_schema(5000)["fields"][-1]["attrs"]
+        self.assertEqual(vector_field_attrs(info)["algorithm"], "hnsw")
+        self.assertEqual(mismatched_vector_attrs(info, expected), {})
+
+    def test_older_reply_with_algorithm_after_type(self):
+        info = _ft_info([
+            b"identifier", b"embedding", b"attribute", b"embedding", b"type", b"VECTOR",
+            b"FLAT", 6, b"TYPE", b"FLOAT16", b"DIM", 384, b"DISTANCE_METRIC", b"IP",
+        ])
+        self.assertEqual(
+            vector_field_attrs(info),
+            {"algorithm": "flat", "datatype": "float16", "distance_metric": "ip"},
+        )
+
+    def test_missing_parameters_are_unknown(self):
+        info = _ft_info(["identifier", "embedding", "attribute", "embedding", "type", "VECTOR"])
+        expected = _help_index_schema(120)["fields"][-1]["attrs"]
+        self.assertEqual(vector_field_attrs(info), {})
+        self.assertEqual(mismatched_vector_attrs(info, expected), {})
+
+    def test_missing_distance_metric_is_not_a_mismatch(self):
+        info = _ft_info([
+            "identifier", "embedding", "attribute", "embedding", "type", "VECTOR",
+            "algorithm", "FLAT", "data_type", "FLOAT16", "dim", 384,
+        ])
+        expected = _help_index_schema(120)["fields"][-1]["attrs"]
+        self.assertNotIn("distance_metric", vector_field_attrs(info))
+        self.assertEqual(mismatched_vector_attrs(info, expected), {})
+
+    def test_outdated_layout_is_a_mismatch(self):
+        info = _ft_info([
+            "identifier", "embedding", "attribute", "embedding", "type", "VECTOR",
+            "algorithm", "FLAT", "data_type", "FLOAT32", "dim", 384,
+            "distance_metric", "COSINE",
+        ])
+        expected = _help_index_schema(120)["fields"][-1]["attrs"]
+        self.assertEqual(
+            mismatched_vector_attrs(info, expected),
+            {"datatype": "float32", "distance_metric": "cosine"},
+        )
+
+    def test_no_vector_field(self):
+        info = _ft_info(["identifier", "body", "attribute", "body", "type", "TEXT"])
+        self.assertEqual(vector_field_attrs(info), {})
+
+
+if __name__ == "__main__":
+    unittest.main()